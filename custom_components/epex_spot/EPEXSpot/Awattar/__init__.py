@@ -1,6 +1,6 @@
 """Awattar API."""
 
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 import logging
 from typing import List
 
@@ -8,25 +8,24 @@ import aiohttp
 
 from homeassistant.util import dt as dt_util
 
-from ...common import Marketprice, compress_marketdata
+from ...common import EpochMarketprice, Marketprice, read_json
+from ...resample import merge_equal_runs
 from ...const import EUR_PER_MWH, UOM_EUR_PER_KWH
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class AwattarMarketprice(Marketprice):
+class AwattarMarketprice(EpochMarketprice):
     """Marketprice class for Awattar."""
 
     def __init__(self, data):
         assert data["unit"].lower() == EUR_PER_MWH.lower()
-        self._start_time = datetime.fromtimestamp(
-            data["start_timestamp"] / 1000, tz=timezone.utc
+        super().__init__(
+            start_timestamp=data["start_timestamp"] / 1000,
+            duration=(data["end_timestamp"] - data["start_timestamp"]) / 60000,
+            price=round(float(data["marketprice"]) / 1000.0, 6),
+            unit=UOM_EUR_PER_KWH,
         )
-        self._end_time = datetime.fromtimestamp(
-            data["end_timestamp"] / 1000, tz=timezone.utc
-        )
-        self._market_price_per_kwh = round(float(data["marketprice"]) / 1000.0, 6)
-        self._unit = UOM_EUR_PER_KWH
 
 
 def toEpochMilliSec(dt: datetime) -> int:
@@ -35,6 +34,7 @@ def toEpochMilliSec(dt: datetime) -> int:
 
 class Awattar:
     URL = "https://api.awattar.{market_area}/v1/marketdata"
+    MAX_BODY_SIZE = 1024 * 1024
 
     MARKET_AREAS = ("at", "de")
     SUPPORTED_DURATIONS = (60,)
@@ -70,7 +70,7 @@ class Awattar:
         data = await self._fetch_data(self._url)
         marketdata = self._extract_marketdata(data["data"])
         if self._duration > 15:
-            marketdata = compress_marketdata(marketdata, self._duration)
+            marketdata = merge_equal_runs(marketdata, self._duration)
         self._marketdata = marketdata
 
     async def _fetch_data(self, url):
@@ -82,7 +82,7 @@ class Awattar:
             url, params={"start": toEpochMilliSec(start), "end": toEpochMilliSec(end)}
         ) as resp:
             resp.raise_for_status()
-            return await resp.json()
+            return await read_json(resp, self.MAX_BODY_SIZE)
 
     def _extract_marketdata(self, data) -> List[Marketprice]:
         entries = []
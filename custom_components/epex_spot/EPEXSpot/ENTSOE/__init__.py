@@ -8,8 +8,8 @@ import aiohttp
 import xml.etree.ElementTree as ET
 from typing import List
 
-# Replace this import with your actual Marketprice & compress_marketdata implementations
-from ...common import Marketprice, average_marketdata
+from ...common import Marketprice, parse_payload, read_body, regular_series
+from ...resample import resample
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -73,6 +73,7 @@ class EntsoeTransparency:
     """Client for ENTSO-E Transparency Platform day-ahead and current prices."""
 
     URL = "https://web-api.tp.entsoe.eu/api"
+    MAX_BODY_SIZE = 4 * 1024 * 1024
 
     MARKET_AREAS = MARKET_AREA_MAP.keys()
 
@@ -116,12 +117,12 @@ class EntsoeTransparency:
 
         day_ahead_data = await self._fetch_day_ahead()
 
-        self._marketdata = sorted(day_ahead_data, key=lambda x: x.start_time)
+        self._marketdata = sorted(day_ahead_data, key=lambda x: x.start_timestamp)
 
-        # Compress if needed
+        # Resample if needed
         if self._duration != 15:
             logging.debug("Averaging market data... from 15 to", self._duration)
-            self._marketdata = average_marketdata(self._marketdata, self._duration)
+            self._marketdata = resample(self._marketdata, self._duration)
 
     async def _fetch_day_ahead(self) -> List[Marketprice]:
         """Fetch day-ahead electricity prices (A44)."""
@@ -139,20 +140,20 @@ class EntsoeTransparency:
             "offset": 0,
         }
 
-        xml_text = await self._fetch_data(self.URL, params)
+        xml_data = await self._fetch_data(self.URL, params)
 
-        return self._extract_marketdata(xml_text)
+        return await parse_payload(xml_data, self._extract_marketdata)
 
     async def _fetch_data(self, url, params):
         """Perform the HTTP GET request."""
         async with self._session.get(url, params=params) as resp:
             resp.raise_for_status()
-            return await resp.text()
+            return await read_body(resp, self.MAX_BODY_SIZE)
 
-    def _extract_marketdata(self, xml_text) -> List[Marketprice]:
+    def _extract_marketdata(self, xml_data: bytes) -> List[Marketprice]:
         """Extract prices (€/MWh → €/kWh) from XML, filling missing positions."""
         entries: List[Marketprice] = []
-        root = ET.fromstring(xml_text)
+        root = ET.fromstring(xml_data)
         ns = {"ns": "urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:3"}
 
         resolution_map = {"PT15M": 15, "PT60M": 60, "PT30M": 30}
@@ -184,45 +185,31 @@ class EntsoeTransparency:
             for period in timeseries.findall("ns:Period", ns):
                 time_interval = period.find("ns:timeInterval", ns)
                 start_str = time_interval.find("ns:start", ns).text
-                start_dt = datetime.strptime(start_str, "%Y-%m-%dT%H:%MZ").replace(
-                    tzinfo=timezone.utc
+                start_ts = (
+                    datetime.strptime(start_str, "%Y-%m-%dT%H:%MZ")
+                    .replace(tzinfo=timezone.utc)
+                    .timestamp()
                 )
 
                 resolution = period.find("ns:resolution", ns).text
                 duration = resolution_map.get(resolution, 60)
 
-                prev_price_kwh = None
-                prev_position = None
-
+                # prices by position, the period is a regular series
+                prices = []
                 for point in period.findall("ns:Point", ns):
                     position = int(point.find("ns:position", ns).text) - 1
                     price_mwh = float(point.find("ns:price.amount", ns).text)
-                    price_kwh = price_mwh / 1000.0
-
-                    if prev_position is not None and position > prev_position + 1:
-                        for missing_pos in range(prev_position + 1, position):
-                            logging.debug(
-                                f"Filling missing position {missing_pos} using previous price {prev_price_kwh} €/kWh"
-                            )
-                            entries.append(
-                                Marketprice(
-                                    start_time=start_dt
-                                    + timedelta(minutes=missing_pos * duration),
-                                    duration=duration,
-                                    price=round(prev_price_kwh, 6),
-                                )
-                            )
-
-                    entries.append(
-                        Marketprice(
-                            start_time=start_dt
-                            + timedelta(minutes=position * duration),
-                            duration=duration,
-                            price=round(price_kwh, 6),
+                    price_kwh = round(price_mwh / 1000.0, 6)
+
+                    if position > len(prices):
+                        prev_price_kwh = prices[-1] if prices else None
+                        logging.debug(
+                            f"Filling missing positions {len(prices)}..{position - 1} using previous price {prev_price_kwh} €/kWh"
                         )
-                    )
+                        prices.extend([prev_price_kwh] * (position - len(prices)))
+
+                    prices.append(price_kwh)
 
-                    prev_price_kwh = price_kwh
-                    prev_position = position
+                entries += regular_series(start_ts, duration, prices)
 
         return entries
@@ -1,11 +1,12 @@
 """Energy-Charts API Client."""
 
-from datetime import date, datetime, timezone, timedelta
+from datetime import date, timedelta
 import logging
 import aiohttp
 from typing import List
 
-from ...common import Marketprice, average_marketdata
+from ...common import EpochMarketprice, Marketprice, read_json
+from ...resample import resample
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -62,6 +63,7 @@ class EnergyCharts:
     """Client for Energy-Charts day-ahead electricity prices."""
 
     URL = "https://api.energy-charts.info/price"
+    MAX_BODY_SIZE = 2 * 1024 * 1024
 
     MARKET_AREAS = BIDDING_ZONES
 
@@ -124,7 +126,7 @@ class EnergyCharts:
         marketdata = self._extract_marketdata(unix_seconds, prices, base_duration, unit)
 
         #
-        # 3) Compress if user requests coarser data
+        # 3) Resample if user requests coarser data
         #
         if self._duration != base_duration:
             _LOGGER.debug(
@@ -132,7 +134,7 @@ class EnergyCharts:
                 base_duration,
                 self._duration,
             )
-            marketdata = average_marketdata(marketdata, self._duration)
+            marketdata = resample(marketdata, self._duration)
 
         self._marketdata = marketdata
 
@@ -153,7 +155,8 @@ class EnergyCharts:
 
         async with self._session.get(self.URL, params=params) as resp:
             resp.raise_for_status()
-            return await resp.json()
+            # decode the raw body with orjson instead of the stdlib json module
+            return await read_json(resp, self.MAX_BODY_SIZE)
 
     #
     # Convert raw JSON arrays to Marketprice objects
@@ -164,12 +167,13 @@ class EnergyCharts:
         entries: List[Marketprice] = []
 
         for ts, price_mwh in zip(unix_seconds, prices):
-            start_time = datetime.fromtimestamp(ts, tz=timezone.utc)
+            if price_mwh is None:
+                continue
             price_kwh = float(price_mwh) / 1000.0
 
             entries.append(
-                Marketprice(
-                    start_time=start_time,
+                EpochMarketprice(
+                    start_timestamp=ts,
                     duration=duration,
                     price=round(price_kwh, 6),
                 )
@@ -6,12 +6,13 @@ import logging
 import aiohttp
 
 
+from ... import common
 from ...const import UOM_EUR_PER_KWH
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class Marketprice:
+class Marketprice(common.Marketprice):
     """Marketprice class for Energyforecast."""
 
     def __init__(self, data):
@@ -37,6 +38,7 @@ class Marketprice:
 
 class Energyforecast:
     URL = "https://www.energyforecast.de/api/v1/predictions/prices_for_ha"
+    MAX_BODY_SIZE = 1024 * 1024
 
     MARKET_AREAS = {
     "de": "DE-LU",
@@ -97,7 +99,7 @@ class Energyforecast:
             },
         ) as resp:
             resp.raise_for_status()
-            return await resp.json()
+            return await common.read_json(resp, self.MAX_BODY_SIZE)
 
     def _extract_marketdata(self, data):
         return [Marketprice(entry) for entry in data]
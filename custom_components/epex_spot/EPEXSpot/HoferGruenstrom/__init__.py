@@ -1,12 +1,12 @@
 """Hofer Gruenstrom API."""
 
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
 import logging
 
 import aiohttp
 
-from ...common import Marketprice, compress_marketdata
+from ...common import Marketprice, get_tzinfo, read_json
+from ...resample import merge_equal_runs
 from ...const import TIMEZONE_HOFER_GRUENSTROM
 
 _LOGGER = logging.getLogger(__name__)
@@ -14,7 +14,7 @@ _LOGGER = logging.getLogger(__name__)
 
 def _set_tz_on_date(date: datetime):
     """Set timezone on a date object."""
-    timezone = ZoneInfo(TIMEZONE_HOFER_GRUENSTROM)
+    timezone = get_tzinfo(TIMEZONE_HOFER_GRUENSTROM)
 
     if date.tzinfo is None:
         return date.replace(tzinfo=timezone)
@@ -24,6 +24,7 @@ def _set_tz_on_date(date: datetime):
 
 class HoferGruenstrom:
     URL = "https://www.xn--hofer-grnstrom-nsb.at/service/energy-manager/spot-prices"
+    MAX_BODY_SIZE = 1024 * 1024
 
     MARKET_AREAS = ("at",)
     SUPPORTED_DURATIONS = (
@@ -65,7 +66,7 @@ class HoferGruenstrom:
 
     async def fetch(self):
         # get todays and tomorrows date components
-        today = datetime.now(ZoneInfo(TIMEZONE_HOFER_GRUENSTROM))
+        today = datetime.now(get_tzinfo(TIMEZONE_HOFER_GRUENSTROM))
         tomorrow = today + timedelta(days=1)
         dates = [today, tomorrow]
 
@@ -87,7 +88,7 @@ class HoferGruenstrom:
             # extract market data
             complete_marketdata = self._extract_marketdata(data, duration)
             if duration < self.duration:
-                complete_marketdata = compress_marketdata(
+                complete_marketdata = merge_equal_runs(
                     complete_marketdata, self.duration
                 )
 
@@ -110,10 +111,10 @@ class HoferGruenstrom:
     async def _fetch_data_for_date(self, date):
         """Fetch data for a specific date."""
         url = f"{self.URL}?year={date.year}&month={date.month}&day={date.day}"
-        # unfortunately it is required to set `ssl` to false since the certificate is not publicly trusted.
+        # unfortunately the session must not verify certificates since the certificate is not publicly trusted.
         # the main reason for this might be that the API is not really meant to be used externally, but just from
         # Hofer Grünstrom's website (https://www.hofer-grünstrom.at/tarife-zum-geld-sparen#spot).
-        async with self._session.get(url, ssl=False) as response:
+        async with self._session.get(url) as response:
             if response.status != 200:
                 if response.status == 204:
                     _LOGGER.debug("No data available for %s yet.", date.isoformat())
@@ -123,7 +124,7 @@ class HoferGruenstrom:
                     response.status,
                 )
                 return None
-            return await response.json()
+            return await read_json(response, self.MAX_BODY_SIZE)
 
     def _get_duration_from_data(self, data):
         if not data:
@@ -1,13 +1,13 @@
 """SMARD.de API."""
 
-from datetime import datetime, timezone
 import logging
-from typing import List
+import re
+from typing import AsyncIterator, List
 
 import aiohttp
 
 from ...const import UOM_EUR_PER_KWH
-from ...common import Marketprice
+from ...common import EpochMarketprice, Marketprice, iter_body, read_json
 
 # from homeassistant.util import dt
 
@@ -32,8 +32,44 @@ MARKET_AREA_MAP = {
 }
 
 
+# one [timestamp, value] pair of the series, value may be null
+SERIES_ENTRY_RE = re.compile(rb"\[\s*(\d+)\s*,\s*(null|[-+\d.eE]+)\s*\]")
+SERIES_KEY = b'"series"'
+CHUNK_SIZE = 16 * 1024
+
+
+async def _iter_series(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple]:
+    """Yield (timestamp in ms, price per MWh) of a series file, skipping nulls.
+
+    The series files contain up to a week of mostly null padded entries, so
+    the entries are extracted from the stream chunk by chunk instead of
+    decoding the whole document.
+    """
+    buffer = b""
+    in_series = False
+    async for chunk in chunks:
+        buffer += chunk
+        if not in_series:
+            pos = buffer.find(SERIES_KEY)
+            if pos < 0:
+                # keep a possibly incomplete key
+                buffer = buffer[-len(SERIES_KEY) :]
+                continue
+            in_series = True
+            buffer = buffer[pos + len(SERIES_KEY) :]
+
+        end = 0
+        for m in SERIES_ENTRY_RE.finditer(buffer):
+            end = m.end()
+            if m[2] != b"null":
+                yield int(m[1]), float(m[2])
+        # keep a possibly incomplete entry for the next chunk
+        buffer = buffer[end:]
+
+
 class SMARD:
     URL = "https://www.smard.de/app/chart_data"
+    MAX_BODY_SIZE = 4 * 1024 * 1024
 
     MARKET_AREAS = MARKET_AREA_MAP.keys()
     SUPPORTED_DURATIONS = (15, 60)
@@ -73,7 +109,7 @@ class SMARD:
         url = f"{self.URL}/{smard_filter}/{smard_region}/index_{self._resolution}.json"
         async with self._session.get(url) as resp:
             resp.raise_for_status()
-            j = await resp.json()
+            j = await read_json(resp, self.MAX_BODY_SIZE)
 
         # fetch last 2 data-series, because on sunday noon starts a new series
         # and then some data is missing
@@ -83,39 +119,26 @@ class SMARD:
 
         for lt in latest_timestamp:
             # get available data
-            data = await self._fetch_data(
+            async for timestamp, price in self._fetch_data(
                 lt, smard_filter, smard_region, self._resolution
-            )
-
-            for entry in data["series"]:
-                if entry[1] is not None:
-                    entries.append(
-                        Marketprice(
-                            start_time=datetime.fromtimestamp(
-                                entry[0] / 1000, tz=timezone.utc
-                            ),
-                            duration=self._duration,
-                            price=round(float(entry[1]) / 1000.0, 6),
-                            unit=UOM_EUR_PER_KWH,
-                        )
+            ):
+                entries.append(
+                    EpochMarketprice(
+                        start_timestamp=timestamp / 1000,
+                        duration=self._duration,
+                        price=round(price / 1000.0, 6),
+                        unit=UOM_EUR_PER_KWH,
                     )
+                )
 
-        if entries[-1].start_time.date() == datetime.today().date():
-            # latest data is on the same day, only return 48 entries
-            # that's yesterday and today
-            self._marketdata = entries[
-                -2 * 24 * 60 // self._duration :
-            ]  # limit number of entries to protect HA recorder
-        else:
-            # latest data is tomorrow, return 72 entries
-            # that's yesterday, today and tomorrow
-            self._marketdata = entries[
-                -3 * 24 * 60 // self._duration :
-            ]  # limit number of entries to protect HA recorder
+        # number of entries is limited by the retention window of SourceShell
+        self._marketdata = entries
 
     async def _fetch_data(self, timestamp, market, region, resolution):
         # get available data
         url = f"{self.URL}/{market}/{region}/{market}_{region}_{resolution}_{timestamp}.json"  # noqa: E501
         async with self._session.get(url) as resp:
             resp.raise_for_status()
-            return await resp.json()
+            chunks = iter_body(resp, self.MAX_BODY_SIZE, CHUNK_SIZE)
+            async for entry in _iter_series(chunks):
+                yield entry
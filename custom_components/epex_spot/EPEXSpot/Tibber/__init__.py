@@ -5,7 +5,7 @@ from datetime import datetime
 import aiohttp
 
 from ...const import UOM_EUR_PER_KWH, TIBBER_DEMO_TOKEN
-from ...common import Marketprice
+from ...common import Marketprice, read_json
 
 TIBBER_QUERY = """
 {
@@ -37,6 +37,7 @@ TIBBER_QUERY = """
 
 class Tibber:
     URL = "https://api.tibber.com/v1-beta/gql"
+    MAX_BODY_SIZE = 1024 * 1024
 
     MARKET_AREAS = ("de", "nl", "no", "se")
     SUPPORTED_DURATIONS = (15, 60)
@@ -92,7 +93,7 @@ class Tibber:
             headers={"Authorization": f"Bearer {self._token}"},
         ) as resp:
             resp.raise_for_status()
-            return await resp.json()
+            return await read_json(resp, self.MAX_BODY_SIZE)
 
     def _extract_marketdata(self, data):
         entries = []
@@ -5,7 +5,8 @@ import logging
 
 import aiohttp
 
-from ...common import Marketprice, compress_marketdata
+from ...common import Marketprice, read_json
+from ...resample import merge_equal_runs
 from ...const import CT_PER_KWH
 
 _LOGGER = logging.getLogger(__name__)
@@ -13,6 +14,7 @@ _LOGGER = logging.getLogger(__name__)
 
 class smartENERGY:
     URL = "https://apis.smartenergy.at/market/v1/price"
+    MAX_BODY_SIZE = 1024 * 1024
 
     MARKET_AREAS = ("at",)
     SUPPORTED_DURATIONS = (15, 60)
@@ -51,12 +53,12 @@ class smartENERGY:
 
         # compress data if required
         if duration < self._duration:
-            self._marketdata = compress_marketdata(self.marketdata, self._duration)
+            self._marketdata = merge_equal_runs(self.marketdata, self._duration)
 
     async def _fetch_data(self, url):
         async with self._session.get(url) as resp:
             resp.raise_for_status()
-            return await resp.json()
+            return await read_json(resp, self.MAX_BODY_SIZE)
 
     def _extract_marketdata(self, data, duration):
         entries = []
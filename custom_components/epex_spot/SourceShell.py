@@ -1,7 +1,11 @@
 """SourceShell"""
 
-from datetime import timedelta
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import takewhile
 import logging
+from operator import attrgetter
 from typing import Any
 
 import aiohttp
@@ -10,12 +14,38 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.util import dt
 
 from custom_components.epex_spot.const import (
+    ATTR_DATA,
+    ATTR_END_TIME,
+    ATTR_START_TIME,
+    CONF_CMP,
+    CONF_CAPACITY,
+    CONF_DATA_FORMAT,
     CONF_DURATION,
     CONF_EARLIEST_START_POST,
+    CONF_EFFICIENCY,
+    CONF_END,
+    CONF_EXPOSE_DATA,
+    CONF_EXTRA_DURATIONS,
+    CONF_FIELDS,
+    CONF_JOBS,
     CONF_EARLIEST_START_TIME,
     CONF_LATEST_END_POST,
     CONF_LATEST_END_TIME,
     CONF_MARKET_AREA,
+    CONF_MAX_CHARGE_POWER,
+    CONF_MAX_DISCHARGE_POWER,
+    CONF_MAX_POWER,
+    CONF_MIN_BLOCK,
+    CONF_MIN_DURATION,
+    CONF_NAME,
+    CONF_PEAK_END,
+    CONF_PEAK_START,
+    CONF_POWER,
+    CONF_PROFILE,
+    CONF_PROFILE_INTERVAL,
+    CONF_RESOLUTION,
+    CONF_RETENTION_FUTURE,
+    CONF_RETENTION_PAST,
     CONF_SOURCE,
     CONF_SOURCE_AWATTAR,
     CONF_SOURCE_ENERGYFORECAST,
@@ -25,15 +55,35 @@ from custom_components.epex_spot.const import (
     CONF_SOURCE_SMARTENERGY,
     CONF_SOURCE_TIBBER,
     CONF_SOURCE_HOFER_GRUENSTROM,
+    CONF_SLOTS,
+    CONF_START,
+    CONF_STATE_OF_CHARGE,
     CONF_SURCHARGE_ABS,
     CONF_SURCHARGE_PERC,
     CONF_TAX,
+    CONF_THRESHOLD,
     CONF_TOKEN,
+    DEFAULT_DATA_FORMAT,
     DEFAULT_DURATION,
+    DEFAULT_EXPOSE_DATA,
+    DEFAULT_EXTRA_DURATIONS,
+    DEFAULT_PEAK_END,
+    DEFAULT_PEAK_START,
+    DEFAULT_RETENTION_FUTURE,
+    DEFAULT_RETENTION_PAST,
     DEFAULT_SURCHARGE_ABS,
     DEFAULT_SURCHARGE_PERC,
     DEFAULT_TAX,
+    EMPTY_BATTERY_SCHEDULE_RESP,
+    EMPTY_CHEAPEST_SLOTS_RESP,
     EMPTY_EXTREME_PRICE_INTERVAL_RESP,
+    EMPTY_PRICE_PROFILE_RESP,
+    EMPTY_THRESHOLD_RUN_RESP,
+    INTERVAL_CACHE_SIZE,
+    ROLLING_WINDOW_HOURS,
+    THRESHOLD_INDEX_CACHE_SIZE,
+    PRICE_FIELD_MARKET,
+    PRICE_FIELD_TOTAL,
 )
 from custom_components.epex_spot.EPEXSpot import (
     SMARD,
@@ -45,18 +95,117 @@ from custom_components.epex_spot.EPEXSpot import (
     EnergyCharts,
     HoferGruenstrom,
 )
-from .extreme_price_interval import find_extreme_price_interval, get_start_times
+from .battery_arbitrage import optimize_battery
+from .cheapest_slots import find_cheapest_slots
+from .common import LRUCache, Marketprice, merge_marketdata, trim_marketdata
+from .job_scheduler import Job, schedule_jobs
+from .load_profile import find_lowest_price_profile
+from .order_statistics import RollingOrderStatistics
+from .price_statistics import (
+    WINDOW_TODAY,
+    PriceStatistics,
+    calc_daily_statistics,
+    calc_rolling_statistics,
+)
+from .resample import resample
+from .threshold_index import ThresholdIndex
+from .extreme_price_interval import (
+    SECONDS_PER_HOUR,
+    CMP_FUNCTIONS,
+    PriceIndex,
+    calc_start_times,
+    find_extreme_price_interval,
+    get_interval_window,
+    interval_result,
+)
+from .process_pool import MIN_PARALLEL_START_TIMES, IntervalProcessPool
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _to_utc(value: datetime | None, default: datetime) -> datetime:
+    if value is None:
+        return default
+    if value.tzinfo is None:
+        # naive date times are given in local time
+        value = value.replace(tzinfo=dt.get_default_time_zone())
+    return dt.as_utc(value)
+
+
+@dataclass(frozen=True, slots=True)
+class MarketSnapshot:
+    """Market data of one data version with its derived structures.
+
+    The lists and the price index are replaced, never modified, when the
+    market data changes, so a snapshot stays consistent.
+    """
+
+    data_version: int
+    marketdata: list[Marketprice]
+    marketdata_now: Marketprice | None
+    price_index: PriceIndex
+    # market data resampled to the requested resolution
+    view: list[Marketprice]
+
+
+def search_extreme_price_intervals(snapshot: MarketSnapshot, searches):
+    """Find the extreme interval of each (start_times, duration, cmp)."""
+    return [
+        find_extreme_price_interval(
+            snapshot.price_index, start_times, duration, CMP_FUNCTIONS[cmp]
+        )
+        for start_times, duration, cmp in searches
+    ]
+
+
+async def async_search_extreme_price_intervals_parallel(
+    pool: IntervalProcessPool, snapshot: MarketSnapshot, searches
+):
+    """Search the extreme intervals in the process pool.
+
+    Searches in this process if there are too few start times to outweigh
+    the overhead of the pool.
+    """
+    if sum(len(start_times) for start_times, _, _ in searches) < (
+        MIN_PARALLEL_START_TIMES
+    ):
+        return search_extreme_price_intervals(snapshot, searches)
+
+    extremes = await pool.async_find_extremes(snapshot.marketdata, searches)
+    return [
+        None if extreme is None else interval_result(*extreme, duration)
+        for (_, duration, _), extreme in zip(searches, extremes)
+    ]
+
+
 class SourceShell:
     def __init__(self, config_entry: ConfigEntry, session: aiohttp.ClientSession):
         self._config_entry = config_entry
+        self._marketdata = []
         self._marketdata_now = None
         self._sorted_marketdata_today = []
+        self._sorted_prices_today = []
+        self._rank_now = None
+        self._quantile_now = None
+        self._daily_statistics = {}
+        self._daily_statistics_key = None
+        self._price_statistics = {}
+        self._rolling_statistics = {}
+        self._rolling_statistics_version = None
+        self._rolling_rank_now = {}
+        self._rolling_quantile_now = {}
+        self._threshold_indexes = LRUCache(THRESHOLD_INDEX_CACHE_SIZE)
+        self._cheap_threshold = None
+        self._cheap_run = None
+        self._expensive_run = None
         self._cheapest_sorted_marketdata_today = None
         self._most_expensive_sorted_marketdata_today = None
+        self._price_index = None
+        self._views = {}
+        self._data_version = 0
+        self._updated_version = None
+        self._updated_day = None
+        self._interval_cache = LRUCache(INTERVAL_CACHE_SIZE)
 
         # create source object
         if config_entry.data[CONF_SOURCE] == CONF_SOURCE_AWATTAR:
@@ -135,7 +284,86 @@ class SourceShell:
 
     @property
     def marketdata(self):
-        return self._source.marketdata
+        return self._marketdata
+
+    @property
+    def data_version(self) -> int:
+        """Incremented whenever new market data has been fetched."""
+        return self._data_version
+
+    @property
+    def interval_cache_stats(self) -> dict[str, int]:
+        return {
+            "hits": self._interval_cache.hits,
+            "misses": self._interval_cache.misses,
+            "size": len(self._interval_cache),
+        }
+
+    @property
+    def price_index(self) -> PriceIndex:
+        """Interval price lookup structure, built once per fetch."""
+        if self._price_index is None:
+            self._price_index = PriceIndex.from_marketdata(self.marketdata)
+        return self._price_index
+
+    @property
+    def expose_data(self) -> bool:
+        """True if sensors shall expose all prices as attribute."""
+        return self._config_entry.options.get(CONF_EXPOSE_DATA, DEFAULT_EXPOSE_DATA)
+
+    @property
+    def data_format(self) -> str:
+        """Encoding of the data attribute of the sensors."""
+        return self._config_entry.options.get(CONF_DATA_FORMAT, DEFAULT_DATA_FORMAT)
+
+    @property
+    def extra_durations(self) -> list[int]:
+        """Coarser durations for which additional sensors are created."""
+        durations = self._config_entry.options.get(
+            CONF_EXTRA_DURATIONS, DEFAULT_EXTRA_DURATIONS
+        )
+        return sorted(int(d) for d in durations if int(d) > self.duration)
+
+    def marketdata_for(self, duration: int | None):
+        """Market data resampled to the given duration in minutes.
+
+        The native market data is returned for durations which are not
+        coarser than the configured one. Resampled views are cached until
+        the market data changes.
+        """
+        if duration is None or duration <= self.duration:
+            return self.marketdata
+        if (view := self._views.get(duration)) is None:
+            view = self._views[duration] = resample(
+                self.marketdata, duration, dt.get_default_time_zone()
+            )
+        return view
+
+    def snapshot(self, resolution: int | None = None) -> MarketSnapshot:
+        """Current market data for a service call.
+
+        Must be taken on the event loop. Services running in the executor
+        only use the snapshot, as the event loop may replace the state of
+        the source meanwhile.
+        """
+        return MarketSnapshot(
+            data_version=self._data_version,
+            marketdata=self.marketdata,
+            marketdata_now=self._marketdata_now,
+            price_index=self.price_index,
+            view=self.marketdata_for(resolution),
+        )
+
+    def marketdata_now_for(self, duration: int | None):
+        """Current entry of the market data resampled to duration, if any."""
+        if duration is None or duration <= self.duration:
+            return self._marketdata_now
+        view = self.marketdata_for(duration)
+        now = dt.now().timestamp()
+        pos = bisect_right(view, now, key=attrgetter("start_timestamp")) - 1
+        if pos >= 0 and now < view[pos].end_timestamp:
+            return view[pos]
+        return None
 
     @property
     def marketdata_now(self):
@@ -146,41 +374,295 @@ class SourceShell:
         """Sorted by price."""
         return self._sorted_marketdata_today
 
+    @property
+    def sorted_prices_today(self):
+        return self._sorted_prices_today
+
+    @property
+    def rank_now(self):
+        return self._rank_now
+
+    @property
+    def quantile_now(self):
+        return self._quantile_now
+
+    def price_statistics(self, window: str) -> PriceStatistics | None:
+        """Statistics of the given window, None if it contains no prices."""
+        return self._price_statistics.get(window)
+
+    def rolling_statistics(self, hours: int) -> RollingOrderStatistics | None:
+        """Order statistics of the next hours, starting with the current entry."""
+        return self._rolling_statistics.get(hours)
+
+    def rolling_rank_now(self, hours: int) -> int | None:
+        return self._rolling_rank_now.get(hours)
+
+    def rolling_quantile_now(self, hours: int) -> float | None:
+        return self._rolling_quantile_now.get(hours)
+
+    def threshold_index(self, threshold: float) -> ThresholdIndex:
+        """Cheap and expensive runs for the threshold, built once per fetch."""
+        if (index := self._threshold_indexes.get(threshold)) is None:
+            index = ThresholdIndex(self.marketdata, threshold)
+            self._threshold_indexes.put(threshold, index)
+        return index
+
+    @property
+    def cheap_threshold(self) -> float | None:
+        """Threshold of cheap_run and expensive_run, today's median price."""
+        return self._cheap_threshold
+
+    @property
+    def cheap_run(self) -> tuple[datetime, datetime] | None:
+        """Current or next run below today's median price."""
+        return self._cheap_run
+
+    @property
+    def expensive_run(self) -> tuple[datetime, datetime] | None:
+        """Current or next run at or above today's median price."""
+        return self._expensive_run
+
+    @property
+    def today(self):
+        """Local date of the last update_time."""
+        return self._updated_day
+
     async def fetch(self, *args: Any):
         await self._source.fetch()
+        now = dt.now()
+        self._apply_retention(now)
+
+        # only merge what would be retained, re-fetched expired entries
+        # must not count as a change
+        marketdata, changed = merge_marketdata(
+            self._marketdata,
+            trim_marketdata(self._source.marketdata, *self._retention_window(now)),
+        )
+        if changed:
+            _LOGGER.debug("%s: market data changed", self.name)
+            self._marketdata = marketdata
+            self._invalidate()
+
+    def _invalidate(self):
+        """Reset everything derived from the market data."""
+        self._price_index = None
+        self._views = {}
+        self._data_version += 1
+        self._interval_cache.clear()
+        self._threshold_indexes.clear()
+
+    def _retention_window(self, now) -> tuple[datetime, datetime]:
+        """Range [earliest, latest) of the entries to keep.
+
+        Entries of today are always kept because the daily statistics are
+        based on them.
+        """
+        options = self._config_entry.options
+        past = timedelta(hours=options.get(CONF_RETENTION_PAST, DEFAULT_RETENTION_PAST))
+        future = timedelta(
+            hours=options.get(CONF_RETENTION_FUTURE, DEFAULT_RETENTION_FUTURE)
+        )
+        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return min(now - past, start_of_day), now + future
+
+    def _apply_retention(self, now):
+        """Evict entries which ended before the retention window.
+
+        Fetched entries are trimmed to the window before merging, so only
+        expired entries at the front are left to evict. The prices within
+        the window don't change, so the data version is kept and the
+        derived structures are re-based on the first retained entry instead
+        of being rebuilt.
+        """
+        earliest, _ = self._retention_window(now)
+        end_timestamp = attrgetter("end_timestamp")
+        first = bisect_right(self._marketdata, earliest.timestamp(), key=end_timestamp)
+        if first == 0:
+            return
+
+        self._marketdata = self._marketdata[first:]
+        ts = (
+            self._marketdata[0].start_timestamp
+            if self._marketdata
+            else earliest.timestamp()
+        )
+        if self._price_index is not None:
+            self._price_index = self._price_index.trimmed(ts)
+        self._threshold_indexes.map_values(lambda index: index.trimmed(ts))
+        self._views = {
+            duration: view[bisect_right(view, ts, key=end_timestamp) :]
+            for duration, view in self._views.items()
+        }
+
+    def needs_update(self, now) -> bool:
+        """True if update_time would change the current entry or today's data."""
+        if self._updated_version != self._data_version:
+            return True
+        if self._updated_day != now.date():
+            return True
+        current = self._marketdata_now
+        ts = now.timestamp()
+        return (
+            current is None or not current.start_timestamp <= ts < current.end_timestamp
+        )
+
+    def next_update(self, now) -> datetime:
+        """Time of the next change of the current entry or day."""
+        next_day = (now + timedelta(days=1)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        if self._marketdata_now is not None:
+            return min(self._marketdata_now.end_time, next_day)
+
+        # no current entry, wait for the next one
+        pos = bisect_right(
+            self.marketdata, now.timestamp(), key=attrgetter("start_timestamp")
+        )
+        if pos < len(self.marketdata):
+            return min(self.marketdata[pos].start_time, next_day)
+        return next_day
 
     def update_time(self):
+        now = dt.now()
+        self._apply_retention(now)
+        self._updated_version = self._data_version
+        self._updated_day = now.date()
+
         if (len(self.marketdata)) == 0:
             self._marketdata_now = None
             self._sorted_marketdata_today = []
+            self._price_statistics = {}
+            self._update_rolling_statistics(now)
+            self._update_threshold_runs(now)
+            self._update_statistics()
             return
 
-        now = dt.now()
-
         # find current entry in marketdata list
-        try:
-            self._marketdata_now = next(
-                filter(
-                    lambda e: e.start_time <= now and e.end_time > now, self.marketdata
-                )
-            )
-        except StopIteration:
+        start_timestamp = attrgetter("start_timestamp")
+        ts = now.timestamp()
+        pos = bisect_right(self.marketdata, ts, key=start_timestamp) - 1
+        if pos >= 0 and ts < self.marketdata[pos].end_timestamp:
+            self._marketdata_now = self.marketdata[pos]
+        else:
             _LOGGER.error(f"no data found for {self._source}")
             self._marketdata_now = None
             self._sorted_marketdata_today = []
 
         # get list of entries for today
         start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
+        end_of_day_ts = (start_of_day + timedelta(days=1)).timestamp()
 
-        sorted_marketdata_today = filter(
-            lambda e: e.start_time >= start_of_day and e.end_time <= end_of_day,
-            self.marketdata,
+        first = bisect_left(
+            self.marketdata, start_of_day.timestamp(), key=start_timestamp
+        )
+        sorted_marketdata_today = takewhile(
+            lambda e: e.end_timestamp <= end_of_day_ts, self.marketdata[first:]
         )
         sorted_sorted_marketdata_today = sorted(
             sorted_marketdata_today, key=lambda e: e.market_price_per_kwh
         )
         self._sorted_marketdata_today = sorted_sorted_marketdata_today
+        self._update_price_statistics(now, start_of_day)
+        self._update_rolling_statistics(now)
+        self._update_threshold_runs(now)
+        self._update_statistics()
+
+    def _update_price_statistics(self, now, start_of_day):
+        """Update the aggregate table.
+
+        The daily windows are calculated once per day and market data
+        version, only the rolling windows follow the current entry.
+        """
+        key = (self._data_version, start_of_day)
+        if key != self._daily_statistics_key:
+            options = self._config_entry.options
+            self._daily_statistics = calc_daily_statistics(
+                self.marketdata,
+                start_of_day,
+                options.get(CONF_PEAK_START, DEFAULT_PEAK_START),
+                options.get(CONF_PEAK_END, DEFAULT_PEAK_END),
+            )
+            self._daily_statistics_key = key
+
+        start = self._marketdata_now.start_time if self._marketdata_now else now
+        self._price_statistics = {
+            **self._daily_statistics,
+            **calc_rolling_statistics(self.marketdata, start),
+        }
+
+    def _update_rolling_statistics(self, now):
+        """Move the rolling windows to the current entry.
+
+        The windows are only rebuilt if the market data changed, otherwise
+        they are moved forward by the expired and arriving entries.
+        """
+        if self._rolling_statistics_version != self._data_version:
+            self._rolling_statistics = {
+                hours: RollingOrderStatistics(self.marketdata, hours)
+                for hours in ROLLING_WINDOW_HOURS
+            }
+            self._rolling_statistics_version = self._data_version
+
+        self._rolling_rank_now = {}
+        self._rolling_quantile_now = {}
+        current = self._marketdata_now
+        for hours, stats in self._rolling_statistics.items():
+            stats.advance(current.start_timestamp if current else now.timestamp())
+            if current is None or stats.count == 0:
+                continue
+
+            price = current.market_price_per_kwh
+            self._rolling_rank_now[hours] = stats.rank(price)
+            min_price = stats.minimum
+            max_price = stats.maximum
+            if max_price != min_price:
+                self._rolling_quantile_now[hours] = (price - min_price) / (
+                    max_price - min_price
+                )
+
+    def _update_threshold_runs(self, now):
+        """Find the current or next runs below and above today's median."""
+        self._cheap_threshold = None
+        self._cheap_run = None
+        self._expensive_run = None
+        stats = self._price_statistics.get(WINDOW_TODAY)
+        if stats is None:
+            return
+
+        self._cheap_threshold = stats.median
+        index = self.threshold_index(stats.median)
+        ts = now.timestamp()
+        if (run := index.next_run(ts, below=True)) is not None:
+            self._cheap_run = tuple(
+                datetime.fromtimestamp(t, timezone.utc) for t in run
+            )
+        if (run := index.next_run(ts, below=False)) is not None:
+            self._expensive_run = tuple(
+                datetime.fromtimestamp(t, timezone.utc) for t in run
+            )
+
+    def _update_statistics(self):
+        """Calculate the values derived from the current entry once per update."""
+        self._sorted_prices_today = [
+            e.market_price_per_kwh for e in self._sorted_marketdata_today
+        ]
+        self._rank_now = None
+        self._quantile_now = None
+        if self._marketdata_now is None or not self._sorted_prices_today:
+            return
+
+        current_price = self._marketdata_now.market_price_per_kwh
+        rank = bisect_left(self._sorted_prices_today, current_price)
+        if (
+            rank < len(self._sorted_prices_today)
+            and self._sorted_prices_today[rank] == current_price
+        ):
+            self._rank_now = rank
+
+        min_price = self._sorted_prices_today[0]
+        max_price = self._sorted_prices_today[-1]
+        if max_price != min_price:
+            self._quantile_now = (current_price - min_price) / (max_price - min_price)
 
     def to_total_price(self, market_price_per_kwh):
         total_price = market_price_per_kwh
@@ -203,29 +685,419 @@ class SourceShell:
 
         return round(total_price, 6)
 
-    def find_extreme_price_interval(self, call_data, cmp):
+    def _interval_request(self, snapshot: MarketSnapshot, call_data, cmp):
+        """Resolve an interval request to its cache key and start times.
+
+        Returns (key, start_times, None) for uncached requests and
+        (None, None, response) if the response is already known. The key
+        is None for requests which must not be cached.
+        """
         duration: timedelta = call_data[CONF_DURATION]
 
-        start_times = get_start_times(
-            marketdata=self.marketdata,
+        if not snapshot.marketdata:
+            return None, None, EMPTY_EXTREME_PRICE_INTERVAL_RESP
+
+        window = get_interval_window(
             earliest_start_time=call_data.get(CONF_EARLIEST_START_TIME),
             earliest_start_post=call_data.get(CONF_EARLIEST_START_POST),
             latest_end_time=call_data.get(CONF_LATEST_END_TIME),
             latest_end_post=call_data.get(CONF_LATEST_END_POST),
-            latest_market_datetime=self.marketdata[-1].end_time,
+            latest_market_datetime=snapshot.marketdata[-1].end_time,
+        )
+        if window is None:
+            return None, None, EMPTY_EXTREME_PRICE_INTERVAL_RESP
+
+        # without an earliest start the window starts at the current time
+        # and would never be requested again, so only fixed windows are
+        # cached. Options changes reload the config entry, so the data
+        # version and the resolved window are sufficient to identify a result
+        key = None
+        if CONF_EARLIEST_START_TIME in call_data:
+            key = (snapshot.data_version, window, duration, cmp)
+            if (response := self._interval_cache.get(key)) is not None:
+                return None, None, response
+
+        start_times = calc_start_times(
+            marketdata=snapshot.marketdata,
+            earliest_start=window[0],
+            latest_end=window[1],
             duration=duration,
         )
+        return key, start_times, None
+
+    def find_extreme_price_interval(self, call_data, cmp):
+        snapshot = self.snapshot()
+        key, start_times, response = self._interval_request(snapshot, call_data, cmp)
+        if response is not None:
+            return response
 
+        duration: timedelta = call_data[CONF_DURATION]
         result = find_extreme_price_interval(
-            self.marketdata, start_times, duration, cmp
+            snapshot.price_index, start_times, duration, cmp
         )
+        return self._interval_response(key, result, duration)
 
+    def _interval_response(self, key, result, duration: timedelta):
+        """Convert and cache the result of an interval request."""
         if result is None:
-            return EMPTY_EXTREME_PRICE_INTERVAL_RESP
+            response = EMPTY_EXTREME_PRICE_INTERVAL_RESP
+        else:
+            response = {
+                "start": result["start"],
+                "end": result["start"] + duration,
+                "market_price_per_kwh": round(result["market_price_per_hour"], 6),
+                "total_price_per_kwh": self.to_total_price(
+                    result["market_price_per_hour"]
+                ),
+            }
+
+        if key is not None:
+            self._interval_cache.put(key, response)
+        _LOGGER.debug(
+            "price interval cache: hits=%d, misses=%d",
+            self._interval_cache.hits,
+            self._interval_cache.misses,
+        )
+        return response
+
+    async def async_find_extreme_price_intervals(self, requests, search):
+        """Answer several interval requests using the same snapshot.
+
+        Requests are resolved and cached on the event loop. The uncached
+        ones are passed to search(snapshot, searches) with a list of
+        (start_times, duration, cmp) searches, which may run in the
+        executor or the process pool.
+        """
+        snapshot = self.snapshot()
+        responses = []
+        pending = []
+        for request in requests:
+            key, start_times, response = self._interval_request(
+                snapshot, request, CMP_FUNCTIONS[request[CONF_CMP]]
+            )
+            if response is None:
+                pending.append((len(responses), key, start_times))
+            responses.append(response)
+
+        if pending:
+            found = await search(
+                snapshot,
+                [
+                    (start_times, requests[i][CONF_DURATION], requests[i][CONF_CMP])
+                    for i, _, start_times in pending
+                ],
+            )
+            for (i, key, _), result in zip(pending, found):
+                responses[i] = self._interval_response(
+                    key, result, requests[i][CONF_DURATION]
+                )
+
+        return [
+            {CONF_NAME: request[CONF_NAME], **response}
+            if CONF_NAME in request
+            else response
+            for request, response in zip(requests, responses)
+        ]
+
+    def find_cheapest_slots(self, snapshot: MarketSnapshot, call_data):
+        if not snapshot.marketdata:
+            return EMPTY_CHEAPEST_SLOTS_RESP
+
+        window = get_interval_window(
+            earliest_start_time=call_data.get(CONF_EARLIEST_START_TIME),
+            earliest_start_post=call_data.get(CONF_EARLIEST_START_POST),
+            latest_end_time=call_data.get(CONF_LATEST_END_TIME),
+            latest_end_post=call_data.get(CONF_LATEST_END_POST),
+            latest_market_datetime=snapshot.marketdata[-1].end_time,
+        )
+        if window is None:
+            return EMPTY_CHEAPEST_SLOTS_RESP
+
+        selected = find_cheapest_slots(
+            snapshot.view,
+            snapshot.price_index,
+            earliest_start=window[0],
+            latest_end=window[1],
+            count=call_data.get(CONF_SLOTS),
+            duration=call_data.get(CONF_DURATION),
+            min_block=call_data.get(CONF_MIN_BLOCK),
+        )
+        if not selected:
+            return EMPTY_CHEAPEST_SLOTS_RESP
+
+        slots = []
+        hours = 0
+        market_price = 0
+        total_price = 0
+        for start, end, price in selected:
+            slot_hours = (end - start).total_seconds() / SECONDS_PER_HOUR
+            total_price_per_kwh = self.to_total_price(price)
+            slots.append(
+                {
+                    "start": dt.as_local(start),
+                    "end": dt.as_local(end),
+                    "market_price_per_kwh": round(price, 6),
+                    "total_price_per_kwh": total_price_per_kwh,
+                }
+            )
+            hours += slot_hours
+            market_price += price * slot_hours
+            total_price += total_price_per_kwh * slot_hours
+
+        return {
+            "slots": slots,
+            "market_price_per_kwh": round(market_price / hours, 6),
+            "total_price_per_kwh": round(total_price / hours, 6),
+            "market_price": round(market_price, 6),
+            "total_price": round(total_price, 6),
+        }
+
+    def find_lowest_price_profile(self, snapshot: MarketSnapshot, call_data):
+        if not snapshot.marketdata:
+            return EMPTY_PRICE_PROFILE_RESP
+
+        window = get_interval_window(
+            earliest_start_time=call_data.get(CONF_EARLIEST_START_TIME),
+            earliest_start_post=call_data.get(CONF_EARLIEST_START_POST),
+            latest_end_time=call_data.get(CONF_LATEST_END_TIME),
+            latest_end_post=call_data.get(CONF_LATEST_END_POST),
+            latest_market_datetime=snapshot.marketdata[-1].end_time,
+        )
+        if window is None:
+            return EMPTY_PRICE_PROFILE_RESP
+
+        profile = call_data[CONF_PROFILE]
+        profile_interval: timedelta = call_data[CONF_PROFILE_INTERVAL]
+
+        result = find_lowest_price_profile(
+            snapshot.price_index,
+            earliest_start=window[0],
+            latest_end=window[1],
+            profile=profile,
+            profile_interval=profile_interval,
+        )
+        if result is None:
+            return EMPTY_PRICE_PROFILE_RESP
+
+        start, prices = result
+        hours = profile_interval.total_seconds() / SECONDS_PER_HOUR
+
+        slots = []
+        energy = 0
+        market_price = 0
+        total_price = 0
+        for i, (power, price) in enumerate(zip(profile, prices)):
+            slot_energy = power * hours
+            total_price_per_kwh = self.to_total_price(price)
+            slots.append(
+                {
+                    "start": dt.as_local(start + i * profile_interval),
+                    "end": dt.as_local(start + (i + 1) * profile_interval),
+                    "power_kw": power,
+                    "energy_kwh": round(slot_energy, 6),
+                    "market_price_per_kwh": round(price, 6),
+                    "total_price_per_kwh": total_price_per_kwh,
+                    "market_price": round(price * slot_energy, 6),
+                    "total_price": round(total_price_per_kwh * slot_energy, 6),
+                }
+            )
+            energy += slot_energy
+            market_price += price * slot_energy
+            total_price += total_price_per_kwh * slot_energy
+
+        return {
+            "start": dt.as_local(start),
+            "end": dt.as_local(start + len(profile) * profile_interval),
+            "energy_kwh": round(energy, 6),
+            "market_price": round(market_price, 6),
+            "total_price": round(total_price, 6),
+            "slots": slots,
+        }
+
+    def optimize_battery(self, snapshot: MarketSnapshot, call_data):
+        now = dt.now()
+        horizon_end = (
+            now + call_data[CONF_DURATION] if CONF_DURATION in call_data else None
+        )
+
+        slots = []
+        for e in snapshot.marketdata:
+            if e.end_time <= now:
+                continue
+            if horizon_end is not None and e.start_time >= horizon_end:
+                break
+            start = max(e.start_time, now)
+            end = e.end_time if horizon_end is None else min(e.end_time, horizon_end)
+            slots.append((start, end, self.to_total_price(e.market_price_per_kwh)))
+
+        if not slots:
+            return EMPTY_BATTERY_SCHEDULE_RESP
+
+        capacity = call_data[CONF_CAPACITY]
+        max_charge_power = call_data[CONF_MAX_CHARGE_POWER]
+        efficiency = call_data[CONF_EFFICIENCY] / 100
+
+        stored, savings = optimize_battery(
+            slots,
+            capacity=capacity,
+            state_of_charge=capacity * call_data[CONF_STATE_OF_CHARGE] / 100,
+            max_charge_power=max_charge_power,
+            max_discharge_power=call_data.get(
+                CONF_MAX_DISCHARGE_POWER, max_charge_power
+            ),
+            efficiency=efficiency,
+        )
+
+        schedule = []
+        charged = 0
+        discharged = 0
+        for (start, end, price), previous, energy in zip(slots, stored, stored[1:]):
+            delta = energy - previous
+            if delta > 0:
+                action = "charge"
+                grid_energy = delta / efficiency**0.5
+                charged += grid_energy
+            elif delta < 0:
+                action = "discharge"
+                grid_energy = delta * efficiency**0.5
+                discharged -= grid_energy
+            else:
+                action = "idle"
+                grid_energy = 0
+            schedule.append(
+                {
+                    "start": dt.as_local(start),
+                    "end": dt.as_local(end),
+                    "action": action,
+                    "energy_kwh": round(grid_energy, 6),
+                    "stored_kwh": round(energy, 6),
+                    "total_price_per_kwh": price,
+                }
+            )
+
+        return {
+            "schedule": schedule,
+            "charged_kwh": round(charged, 6),
+            "discharged_kwh": round(discharged, 6),
+            "savings": round(savings, 6),
+        }
+
+    def schedule_jobs(self, snapshot: MarketSnapshot, call_data):
+        jobs = []
+        for job_data in call_data[CONF_JOBS]:
+            duration: timedelta = job_data[CONF_DURATION]
+            # without market data every job stays unscheduled
+            window = (
+                get_interval_window(
+                    earliest_start_time=job_data.get(CONF_EARLIEST_START_TIME),
+                    earliest_start_post=job_data.get(CONF_EARLIEST_START_POST),
+                    latest_end_time=job_data.get(CONF_LATEST_END_TIME),
+                    latest_end_post=job_data.get(CONF_LATEST_END_POST),
+                    latest_market_datetime=snapshot.marketdata[-1].end_time,
+                )
+                if snapshot.marketdata
+                else None
+            )
+            jobs.append(
+                Job(
+                    name=job_data[CONF_NAME],
+                    duration=duration,
+                    power=job_data[CONF_POWER],
+                    earliest_start=window[0] if window else None,
+                    latest_end=window[1] if window else None,
+                    start_times=calc_start_times(
+                        marketdata=snapshot.marketdata,
+                        earliest_start=window[0],
+                        latest_end=window[1],
+                        duration=duration,
+                    )
+                    if window
+                    else [],
+                )
+            )
+
+        schedule_jobs(jobs, snapshot.price_index, call_data[CONF_MAX_POWER])
+
+        result = []
+        market_price = 0
+        total_price = 0
+        for job in jobs:
+            if job.start is None:
+                result.append(
+                    {
+                        CONF_NAME: job.name,
+                        "start": None,
+                        "end": None,
+                        "market_price": None,
+                        "total_price": None,
+                    }
+                )
+                continue
+
+            hours = job.duration.total_seconds() / SECONDS_PER_HOUR
+            energy = job.power * hours
+            job_total_price = self.to_total_price(job.price / energy) * energy
+            result.append(
+                {
+                    CONF_NAME: job.name,
+                    "start": dt.as_local(job.start),
+                    "end": dt.as_local(job.end),
+                    "market_price": round(job.price, 6),
+                    "total_price": round(job_total_price, 6),
+                }
+            )
+            market_price += job.price
+            total_price += job_total_price
+
+        return {
+            CONF_JOBS: result,
+            "market_price": round(market_price, 6),
+            "total_price": round(total_price, 6),
+        }
+
+    def get_prices(self, call_data):
+        # resample before trimming to keep buckets overlapping the range
+        marketdata = trim_marketdata(
+            self.marketdata_for(call_data.get(CONF_RESOLUTION)),
+            earliest=_to_utc(
+                call_data.get(CONF_START), datetime.min.replace(tzinfo=timezone.utc)
+            ),
+            latest=_to_utc(
+                call_data.get(CONF_END), datetime.max.replace(tzinfo=timezone.utc)
+            ),
+        )
+
+        fields = call_data[CONF_FIELDS]
+        data = []
+        for e in marketdata:
+            entry = {
+                ATTR_START_TIME: dt.as_local(e.start_time),
+                ATTR_END_TIME: dt.as_local(e.end_time),
+            }
+            if PRICE_FIELD_MARKET in fields:
+                entry[PRICE_FIELD_MARKET] = e.market_price_per_kwh
+            if PRICE_FIELD_TOTAL in fields:
+                entry[PRICE_FIELD_TOTAL] = self.to_total_price(e.market_price_per_kwh)
+            data.append(entry)
+
+        return {ATTR_DATA: data}
+
+    def find_next_below_threshold(self, call_data):
+        start = _to_utc(call_data.get(CONF_START), dt.utcnow()).timestamp()
+        min_duration = call_data.get(CONF_MIN_DURATION)
+        run = self.threshold_index(call_data[CONF_THRESHOLD]).next_run(
+            start,
+            below=True,
+            min_duration=0 if min_duration is None else min_duration.total_seconds(),
+        )
+        if run is None:
+            return EMPTY_THRESHOLD_RUN_RESP
 
+        run_start = max(run[0], start)
+        market_price = self.price_index.average_price(run_start, run[1])
         return {
-            "start": result["start"],
-            "end": result["start"] + duration,
-            "market_price_per_kwh": round(result["market_price_per_hour"], 6),
-            "total_price_per_kwh": self.to_total_price(result["market_price_per_hour"]),
+            "start": dt.as_local(datetime.fromtimestamp(run_start, timezone.utc)),
+            "end": dt.as_local(datetime.fromtimestamp(run[1], timezone.utc)),
+            "market_price_per_kwh": round(market_price, 6),
+            "total_price_per_kwh": self.to_total_price(market_price),
         }
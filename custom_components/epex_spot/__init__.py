@@ -1,6 +1,7 @@
 """Component for EPEX Spot support."""
 
 import asyncio
+from functools import partial
 import logging
 import random
 from typing import Any, Callable
@@ -12,11 +13,11 @@ from homeassistant.const import ATTR_DEVICE_ID, Platform
 from homeassistant.core import (
     HomeAssistant,
     ServiceCall,
+    callback,
     ServiceResponse,
     SupportsResponse,
 )
 from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.device_registry import (
     DeviceEntryType,
@@ -24,7 +25,6 @@ from homeassistant.helpers.device_registry import (
     async_get as dr_async_get,
 )
 from homeassistant.helpers.entity import Entity, EntityDescription
-from homeassistant.helpers.event import async_track_time_change
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
@@ -32,17 +32,56 @@ from homeassistant.helpers.update_coordinator import (
 
 from .const import (
     ATTR_DATA,
+    CONF_CAPACITY,
+    CONF_CMP,
     CONF_DURATION,
     CONF_EARLIEST_START_POST,
     CONF_EARLIEST_START_TIME,
+    CONF_EFFICIENCY,
+    CONF_END,
+    CONF_FIELDS,
+    CONF_INTERVALS,
+    CONF_JOBS,
     CONF_LATEST_END_POST,
     CONF_LATEST_END_TIME,
+    CONF_MAX_CHARGE_POWER,
+    CONF_MAX_DISCHARGE_POWER,
+    CONF_MAX_POWER,
+    CONF_MIN_BLOCK,
+    CONF_MIN_DURATION,
+    CONF_NAME,
+    CONF_PARALLEL,
+    CONF_POWER,
+    CONF_PROFILE,
+    CONF_PROFILE_INTERVAL,
+    CONF_RESOLUTION,
+    CONF_SECONDS,
+    CONF_SLOTS,
+    CONF_SOURCE,
+    CONF_START,
+    CONF_STATE_OF_CHARGE,
     CONF_SURCHARGE_ABS,
+    CONF_THRESHOLD,
     CONFIG_VERSION,
+    DEFAULT_EFFICIENCY,
+    DEFAULT_PROFILE_INTERVAL,
+    DEFAULT_PROFILE_SECONDS,
     DOMAIN,
+    EXECUTOR_PROBLEM_SIZE,
+    PRICE_FIELDS,
 )
+from .battery_arbitrage import SOC_LEVELS
+from .client_session import async_close_client_sessions, async_get_client_sessions
+from .extreme_price_interval import CMP_FUNCTIONS
 from .localization import CURRENCY_MAPPING
-from .SourceShell import SourceShell
+from .process_pool import async_get_process_pool, async_shutdown_process_pool
+from .profiler import async_profile
+from .SourceShell import (
+    SourceShell,
+    async_search_extreme_price_intervals_parallel,
+    search_extreme_price_intervals,
+)
+from .tick_scheduler import async_get_tick_scheduler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -58,17 +97,148 @@ GET_EXTREME_PRICE_INTERVAL_SCHEMA = vol.Schema(
         vol.Required(CONF_DURATION): cv.positive_time_period,
     }
 )
+PRICE_INTERVAL_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Optional(CONF_CMP, default="lowest"): vol.In(CMP_FUNCTIONS),
+        vol.Optional(CONF_EARLIEST_START_TIME): cv.time,
+        vol.Optional(CONF_EARLIEST_START_POST): cv.positive_int,
+        vol.Optional(CONF_LATEST_END_TIME): cv.time,
+        vol.Optional(CONF_LATEST_END_POST): cv.positive_int,
+        vol.Required(CONF_DURATION): cv.positive_time_period,
+    }
+)
+GET_PRICE_INTERVALS_SCHEMA = vol.Schema(
+    {
+        **cv.ENTITY_SERVICE_FIELDS,  # for device_id
+        vol.Required(CONF_INTERVALS): vol.All(
+            cv.ensure_list, vol.Length(min=1), [PRICE_INTERVAL_SCHEMA]
+        ),
+        vol.Optional(CONF_PARALLEL, default=False): cv.boolean,
+    }
+)
+
+
+def _min_block_requires_duration(data: dict[str, Any]) -> dict[str, Any]:
+    """Reject min_block in count mode, blocks are only selected by duration."""
+    if CONF_MIN_BLOCK in data and CONF_DURATION not in data:
+        raise vol.Invalid(
+            f"{CONF_MIN_BLOCK} can only be used together with {CONF_DURATION}, "
+            f"not with {CONF_SLOTS}",
+            path=[CONF_MIN_BLOCK],
+        )
+    return data
+
+
+GET_CHEAPEST_SLOTS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            **cv.ENTITY_SERVICE_FIELDS,  # for device_id
+            vol.Optional(CONF_EARLIEST_START_TIME): cv.time,
+            vol.Optional(CONF_EARLIEST_START_POST): cv.positive_int,
+            vol.Optional(CONF_LATEST_END_TIME): cv.time,
+            vol.Optional(CONF_LATEST_END_POST): cv.positive_int,
+            vol.Exclusive(CONF_SLOTS, "amount"): vol.All(
+                vol.Coerce(int), vol.Range(min=1)
+            ),
+            vol.Exclusive(CONF_DURATION, "amount"): cv.positive_time_period,
+            vol.Optional(CONF_MIN_BLOCK): cv.positive_time_period,
+            vol.Optional(CONF_RESOLUTION): vol.All(
+                vol.Coerce(int), vol.In([15, 30, 60])
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(CONF_SLOTS, CONF_DURATION),
+    _min_block_requires_duration,
+)
+GET_LOWEST_PRICE_PROFILE_SCHEMA = vol.Schema(
+    {
+        **cv.ENTITY_SERVICE_FIELDS,  # for device_id
+        vol.Optional(CONF_EARLIEST_START_TIME): cv.time,
+        vol.Optional(CONF_EARLIEST_START_POST): cv.positive_int,
+        vol.Optional(CONF_LATEST_END_TIME): cv.time,
+        vol.Optional(CONF_LATEST_END_POST): cv.positive_int,
+        vol.Required(CONF_PROFILE): vol.All(
+            cv.ensure_list, vol.Length(min=1), [vol.Coerce(float)]
+        ),
+        vol.Optional(
+            CONF_PROFILE_INTERVAL, default={"minutes": DEFAULT_PROFILE_INTERVAL}
+        ): vol.All(cv.time_period, cv.positive_timedelta),
+    }
+)
+GET_BATTERY_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        **cv.ENTITY_SERVICE_FIELDS,  # for device_id
+        vol.Required(CONF_CAPACITY): cv.positive_float,
+        vol.Required(CONF_STATE_OF_CHARGE): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=100)
+        ),
+        vol.Required(CONF_MAX_CHARGE_POWER): cv.positive_float,
+        vol.Optional(CONF_MAX_DISCHARGE_POWER): cv.positive_float,
+        vol.Optional(CONF_EFFICIENCY, default=DEFAULT_EFFICIENCY): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=100)
+        ),
+        vol.Optional(CONF_DURATION): vol.All(cv.time_period, cv.positive_timedelta),
+    }
+)
+JOB_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Required(CONF_POWER): cv.positive_float,
+        vol.Optional(CONF_EARLIEST_START_TIME): cv.time,
+        vol.Optional(CONF_EARLIEST_START_POST): cv.positive_int,
+        vol.Optional(CONF_LATEST_END_TIME): cv.time,
+        vol.Optional(CONF_LATEST_END_POST): cv.positive_int,
+        vol.Required(CONF_DURATION): vol.All(cv.time_period, cv.positive_timedelta),
+    }
+)
+GET_DEVICE_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        **cv.ENTITY_SERVICE_FIELDS,  # for device_id
+        vol.Required(CONF_MAX_POWER): cv.positive_float,
+        vol.Required(CONF_JOBS): vol.All(
+            cv.ensure_list, vol.Length(min=1), [JOB_SCHEMA]
+        ),
+    }
+)
+GET_PRICES_SCHEMA = vol.Schema(
+    {
+        **cv.ENTITY_SERVICE_FIELDS,  # for device_id
+        vol.Optional(CONF_START): cv.datetime,
+        vol.Optional(CONF_END): cv.datetime,
+        vol.Optional(CONF_RESOLUTION): vol.All(vol.Coerce(int), vol.In([15, 30, 60])),
+        vol.Optional(CONF_FIELDS, default=list(PRICE_FIELDS)): vol.All(
+            cv.ensure_list, vol.Length(min=1), [vol.In(PRICE_FIELDS)]
+        ),
+    }
+)
+FIND_NEXT_BELOW_THRESHOLD_SCHEMA = vol.Schema(
+    {
+        **cv.ENTITY_SERVICE_FIELDS,  # for device_id
+        vol.Required(CONF_THRESHOLD): vol.Coerce(float),
+        vol.Optional(CONF_START): cv.datetime,
+        vol.Optional(CONF_MIN_DURATION): cv.positive_time_period,
+    }
+)
 FETCH_DATA_SCHEMA = vol.Schema(
     {
         **cv.ENTITY_SERVICE_FIELDS,  # for device_id
     }
 )
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_SECONDS, default=DEFAULT_PROFILE_SECONDS): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+    }
+)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up component from a config entry."""
 
-    source = SourceShell(entry, async_get_clientsession(hass))
+    sessions = async_get_client_sessions(hass)
+    source = SourceShell(entry, sessions.session_for(entry.data[CONF_SOURCE]))
 
     try:
         await source.fetch()
@@ -85,43 +255,115 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    entry.async_on_unload(
-        async_track_time_change(
-            hass, coordinator.on_refresh, hour=None, minute=0, second=0
-        )
-    )
-    if source.duration == 30 or source.duration == 15:
-        entry.async_on_unload(
-            async_track_time_change(
-                hass, coordinator.on_refresh, hour=None, minute=30, second=0
+    entry.async_on_unload(async_get_tick_scheduler(hass).async_add(coordinator))
+
+    # service call handling
+    async def get_lowest_price_interval(call: ServiceCall) -> ServiceResponse:
+        """Get the time interval during which the price is at its lowest point."""
+        return _find_extreme_price_interval(call, CMP_FUNCTIONS["lowest"])
+
+    async def get_highest_price_interval(call: ServiceCall) -> ServiceResponse:
+        """Get the time interval during which the price is at its highest point."""
+        return _find_extreme_price_interval(call, CMP_FUNCTIONS["highest"])
+
+    async def get_price_intervals(call: ServiceCall) -> ServiceResponse:
+        """Get the lowest/highest price intervals for several requests at once."""
+        coordinator = _get_coordinator(call)
+        if coordinator is None:
+            return None
+
+        intervals = call.data[CONF_INTERVALS]
+        if call.data[CONF_PARALLEL]:
+            search = partial(
+                async_search_extreme_price_intervals_parallel,
+                async_get_process_pool(hass),
             )
-        )
-    if source.duration == 15:
-        entry.async_on_unload(
-            async_track_time_change(
-                hass, coordinator.on_refresh, hour=None, minute=15, second=0
+        else:
+            search = partial(
+                _async_run, coordinator, len(intervals), search_extreme_price_intervals
             )
-        )
-        entry.async_on_unload(
-            async_track_time_change(
-                hass, coordinator.on_refresh, hour=None, minute=45, second=0
+
+        return {
+            CONF_INTERVALS: await coordinator.source.async_find_extreme_price_intervals(
+                intervals, search
             )
+        }
+
+    async def get_cheapest_slots(call: ServiceCall) -> ServiceResponse:
+        """Get the cheapest, not necessarily contiguous, slots within a window."""
+        coordinator = _get_coordinator(call)
+        if coordinator is None:
+            return None
+
+        source = coordinator.source
+        return await _async_run(
+            coordinator,
+            1,
+            source.find_cheapest_slots,
+            source.snapshot(call.data.get(CONF_RESOLUTION)),
+            call.data,
         )
 
-    entry.async_on_unload(
-        async_track_time_change(
-            hass, coordinator.fetch_source, hour=None, minute=50, second=0
+    async def get_lowest_price_profile(call: ServiceCall) -> ServiceResponse:
+        """Get the start time with the lowest cost for a power profile."""
+        coordinator = _get_coordinator(call)
+        if coordinator is None:
+            return None
+
+        source = coordinator.source
+        return await _async_run(
+            coordinator,
+            len(call.data[CONF_PROFILE]),
+            source.find_lowest_price_profile,
+            source.snapshot(),
+            call.data,
         )
-    )
 
-    # service call handling
-    async def get_lowest_price_interval(call: ServiceCall) -> ServiceResponse:
-        """Get the time interval during which the price is at its lowest point."""
-        return _find_extreme_price_interval(call, lambda a, b: a < b)
+    async def get_battery_schedule(call: ServiceCall) -> ServiceResponse:
+        """Get the cost-optimal charge/discharge schedule for a battery."""
+        coordinator = _get_coordinator(call)
+        if coordinator is None:
+            return None
 
-    async def get_highest_price_interval(call: ServiceCall) -> ServiceResponse:
-        """Get the time interval during which the price is at its highest point."""
-        return _find_extreme_price_interval(call, lambda a, b: a > b)
+        source = coordinator.source
+        return await _async_run(
+            coordinator,
+            SOC_LEVELS,
+            source.optimize_battery,
+            source.snapshot(),
+            call.data,
+        )
+
+    async def get_device_schedule(call: ServiceCall) -> ServiceResponse:
+        """Get the cheapest start times for several devices sharing a power limit."""
+        coordinator = _get_coordinator(call)
+        if coordinator is None:
+            return None
+
+        source = coordinator.source
+        return await _async_run(
+            coordinator,
+            len(call.data[CONF_JOBS]),
+            source.schedule_jobs,
+            source.snapshot(),
+            call.data,
+        )
+
+    async def get_prices(call: ServiceCall) -> ServiceResponse:
+        """Get the prices for a time range."""
+        coordinator = _get_coordinator(call)
+        if coordinator is None:
+            return None
+
+        return coordinator.source.get_prices(call_data=call.data)
+
+    async def find_next_below_threshold(call: ServiceCall) -> ServiceResponse:
+        """Get the next time range during which the price is below a threshold."""
+        coordinator = _get_coordinator(call)
+        if coordinator is None:
+            return None
+
+        return coordinator.source.find_next_below_threshold(call_data=call.data)
 
     async def fetch_data(call: ServiceCall) -> None:
         entries = hass.data[DOMAIN]
@@ -137,20 +379,48 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         for c in coordinators:
             await c.source.fetch()
             await c.on_refresh()
-
-    def _find_extreme_price_interval(
-        call: ServiceCall, cmp: Callable[[float, float], bool]
-    ) -> ServiceResponse:
+        async_get_tick_scheduler(hass).async_reschedule()
+
+    async def profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the integration for a bounded time window."""
+        files = await async_profile(hass, call.data[CONF_SECONDS])
+        return {
+            **files,
+            "connections": async_get_client_sessions(hass).stats.as_dict(),
+            "interval_cache": {
+                entry_id: c.source.interval_cache_stats
+                for entry_id, c in hass.data[DOMAIN].items()
+            },
+        }
+
+    def _get_coordinator(call: ServiceCall):
         entries = hass.data[DOMAIN]
         if ATTR_DEVICE_ID in call.data:
             device_id = call.data[ATTR_DEVICE_ID][0]
             device_registry = dr_async_get(hass)
             if not (device_entry := device_registry.async_get(device_id)):
                 raise HomeAssistantError(f"No device found for device id: {device_id}")
-            coordinator = entries[next(iter(device_entry.config_entries))]
-        else:
-            coordinator = next(iter(entries.values()))
+            return entries[next(iter(device_entry.config_entries))]
+
+        return next(iter(entries.values()))
 
+    async def _async_run(coordinator, requests: int, func: Callable, *args):
+        """Run a service in the executor if the problem is large.
+
+        The size is estimated by the number of market data entries times
+        the number of requests (intervals, jobs, ...) of the call. Small
+        problems are answered directly to avoid the executor overhead.
+        Market data must be passed as a snapshot taken on the event loop,
+        func must not use the state of the source.
+        """
+        if len(coordinator.source.marketdata) * requests < EXECUTOR_PROBLEM_SIZE:
+            return func(*args)
+        return await hass.async_add_executor_job(func, *args)
+
+    def _find_extreme_price_interval(
+        call: ServiceCall, cmp: Callable[[float, float], bool]
+    ) -> ServiceResponse:
+        coordinator = _get_coordinator(call)
         if coordinator is None:
             return None
 
@@ -172,9 +442,65 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         schema=GET_EXTREME_PRICE_INTERVAL_SCHEMA,
         supports_response=SupportsResponse.ONLY,
     )
+    hass.services.async_register(
+        DOMAIN,
+        "get_price_intervals",
+        get_price_intervals,
+        schema=GET_PRICE_INTERVALS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "get_cheapest_slots",
+        get_cheapest_slots,
+        schema=GET_CHEAPEST_SLOTS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "get_lowest_price_profile",
+        get_lowest_price_profile,
+        schema=GET_LOWEST_PRICE_PROFILE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "get_battery_schedule",
+        get_battery_schedule,
+        schema=GET_BATTERY_SCHEDULE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "get_device_schedule",
+        get_device_schedule,
+        schema=GET_DEVICE_SCHEDULE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "get_prices",
+        get_prices,
+        schema=GET_PRICES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "find_next_below_threshold",
+        find_next_below_threshold,
+        schema=FIND_NEXT_BELOW_THRESHOLD_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
     hass.services.async_register(
         DOMAIN, "fetch_data", fetch_data, schema=FETCH_DATA_SCHEMA
     )
+    hass.services.async_register(
+        DOMAIN,
+        "profile",
+        profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
 
     return True
 
@@ -185,6 +511,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        if not hass.data[DOMAIN]:
+            async_shutdown_process_pool(hass)
+            await async_close_client_sessions(hass)
     return unload_ok
 
 
@@ -273,6 +602,7 @@ class EpexSpotEntity(CoordinatorEntity, Entity):
         self._source = coordinator.source
         self._localized = CURRENCY_MAPPING[coordinator.source.currency]
         self._attr_unique_id = f"{self._source.unique_id} {description.key}"
+        self._state_signature = None
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, f"{self._source.name} {self._source.market_area}")},
             name="EPEX Spot Data",
@@ -284,3 +614,32 @@ class EpexSpotEntity(CoordinatorEntity, Entity):
     @property
     def available(self) -> bool:
         return super().available and self._source._marketdata_now is not None
+
+    def _signature_extra(self) -> Any:
+        """State which may change without a new native value, version or day."""
+        return None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if it changed since the last update.
+
+        Most attributes depend on the market data and the entries of today
+        only, so they can't change without a new data version or day.
+        Entities with attributes following the current entry or exposing
+        the market data, which eviction shortens without a new data
+        version, add them by _signature_extra.
+        """
+        signature = (
+            (
+                self.native_value,
+                self._source.data_version,
+                self._source.today,
+                self._signature_extra(),
+            )
+            if self.available
+            else None
+        )
+        if signature == self._state_signature:
+            return
+        self._state_signature = signature
+        self.async_write_ha_state()
@@ -0,0 +1,106 @@
+from datetime import datetime
+import math
+
+from .extreme_price_interval import SECONDS_PER_HOUR
+
+# minimum and maximum number of discrete state of charge steps used by the
+# optimizer
+SOC_LEVELS = 40
+MAX_SOC_LEVELS = 1000
+
+
+def optimize_battery(
+    slots: list[tuple[datetime, datetime, float]],
+    capacity: float,
+    state_of_charge: float,
+    max_charge_power: float,
+    max_discharge_power: float,
+    efficiency: float,
+):
+    """Calculate the cost-optimal charge/discharge plan for a battery.
+
+    The slots contain (start, end, price per kWh). Charging buys energy at the
+    slot price, discharging avoids buying energy at the slot price. The round
+    trip efficiency is split equally between charging and discharging.
+
+    The state of charge is discretized into steps and optimized by dynamic
+    programming, which is O(slots * levels * moves). Only the range the
+    battery can reach from the initial state of charge within the slots is
+    discretized. A step is at most the energy the battery can charge or
+    discharge within a slot, so slow batteries can move in every slot, but
+    the range has at least SOC_LEVELS steps. If it would need more than
+    MAX_SOC_LEVELS steps, the range is narrowed around the initial state of
+    charge instead. The battery has to end with at least the initial state
+    of charge, so the plan doesn't gain from just emptying the battery.
+
+    Returns a tuple of the stored energy (kWh) at the beginning followed by
+    the stored energy after each slot, and the expected savings compared to
+    not using the battery.
+    """
+    eff = math.sqrt(efficiency)
+    hours = [
+        (end - start).total_seconds() / SECONDS_PER_HOUR for start, end, _ in slots
+    ]
+
+    # range of the state of charge reachable within the slots
+    low = max(0.0, state_of_charge - max_discharge_power / eff * sum(hours))
+    high = min(capacity, state_of_charge + max_charge_power * eff * sum(hours))
+
+    # the first slot starts now and may be shorter than the others
+    slot_hours = min(hours[1:] or hours, default=0)
+    slot_energy = min(max_charge_power * eff, max_discharge_power / eff) * slot_hours
+    if slot_energy <= 0 or high <= low:
+        levels = SOC_LEVELS
+        step = capacity / levels
+        low = 0.0
+    else:
+        levels = max(SOC_LEVELS, math.ceil((high - low) / slot_energy))
+        step = (high - low) / levels
+        if levels > MAX_SOC_LEVELS:
+            levels = MAX_SOC_LEVELS
+            step = slot_energy
+            # narrow the range around the initial state of charge
+            width = levels * step
+            low = min(max(low, state_of_charge - width / 2), high - width)
+    initial = min(levels, max(0, round((state_of_charge - low) / step)))
+
+    # price per level step for charging / discharging and maximum moves
+    moves = []
+    for (_, _, price), h in zip(slots, hours):
+        up = min(levels, int(max_charge_power * h * eff / step + 1e-9))
+        down = min(levels, int(max_discharge_power * h / eff / step + 1e-9))
+        moves.append((up, down, price * step / eff, price * step * eff))
+
+    # backward induction, value = cost to go (negative = savings)
+    inf = math.inf
+    value = [0.0 if level >= initial else inf for level in range(levels + 1)]
+    policy: list[list[int]] = []
+    for up, down, charge_cost, discharge_gain in reversed(moves):
+        next_value = value
+        value = [inf] * (levels + 1)
+        decision = [0] * (levels + 1)
+        for level in range(levels + 1):
+            best = next_value[level]
+            best_move = 0
+            for m in range(1, min(up, levels - level) + 1):
+                v = next_value[level + m] + m * charge_cost
+                if v < best:
+                    best = v
+                    best_move = m
+            for m in range(1, min(down, level) + 1):
+                v = next_value[level - m] - m * discharge_gain
+                if v < best:
+                    best = v
+                    best_move = -m
+            value[level] = best
+            decision[level] = best_move
+        policy.append(decision)
+    policy.reverse()
+
+    level = initial
+    stored = [low + level * step]
+    for decision in policy:
+        level += decision[level]
+        stored.append(low + level * step)
+
+    return stored, -value[initial]
@@ -0,0 +1,132 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+import heapq
+import math
+from operator import itemgetter
+
+from .extreme_price_interval import PriceIndex
+
+
+def _clip_marketdata(marketdata, earliest_start: datetime, latest_end: datetime):
+    """Return (start, end, price) of all entries clipped to the given window."""
+    slots = []
+    for e in marketdata:
+        start = max(e.start_time, earliest_start)
+        end = min(e.end_time, latest_end)
+        if start < end:
+            slots.append((start, end, e.market_price_per_kwh))
+    return slots
+
+
+def _select_by_count(slots, count: int):
+    if count > len(slots):
+        return []
+    return heapq.nsmallest(count, slots, key=itemgetter(2))
+
+
+def _select_by_duration(slots, duration: timedelta):
+    heap = [(price, i) for i, (_, _, price) in enumerate(slots)]
+    heapq.heapify(heap)
+
+    selected = []
+    remaining = duration
+    while heap and remaining > timedelta(0):
+        price, i = heapq.heappop(heap)
+        start, end, _ = slots[i]
+        # use only the beginning of the last slot if it is longer than needed
+        end = min(end, start + remaining)
+        selected.append((start, end, price))
+        remaining -= end - start
+
+    if remaining > timedelta(0):
+        return []
+    return selected
+
+
+def _select_by_blocks(
+    slots, duration: timedelta, min_block: timedelta, index: PriceIndex
+):
+    """Select the cheapest non-overlapping blocks of length min_block.
+
+    Blocks start at the beginning of a market data entry. As many blocks as
+    needed to cover the duration are selected, therefore the total duration
+    may exceed the requested duration by less than min_block. The selection
+    is a dynamic program over the block starts, which is
+    O(blocks * starts).
+    """
+    if not slots:
+        return []
+
+    latest_end = slots[-1][1]
+    block_seconds = min_block.total_seconds()
+
+    # candidate blocks sorted by start
+    starts = []
+    timestamps = []
+    prices = []
+    for start, _, _ in slots:
+        if start + min_block > latest_end:
+            break
+        ts = start.timestamp()
+        price = index.average_price(ts, ts + block_seconds)
+        if price is not None:
+            starts.append(start)
+            timestamps.append(ts)
+            prices.append(price)
+
+    count = math.ceil(duration / min_block)
+    n = len(starts)
+    if count > n:
+        return []
+
+    # number of candidates ending before candidate i starts
+    compatible = [bisect_right(timestamps, ts - block_seconds) for ts in timestamps]
+
+    # cost[j][m] = lowest price sum of j blocks among the first m candidates
+    inf = math.inf
+    cost = [[0.0] * (n + 1)]
+    for j in range(1, count + 1):
+        previous = cost[-1]
+        row = [inf] * (n + 1)
+        for m in range(1, n + 1):
+            row[m] = min(row[m - 1], previous[compatible[m - 1]] + prices[m - 1])
+        cost.append(row)
+
+    if cost[count][n] == inf:
+        return []
+
+    selected = []
+    m = n
+    for j in range(count, 0, -1):
+        while cost[j][m] == cost[j][m - 1]:
+            m -= 1
+        selected.append((starts[m - 1], starts[m - 1] + min_block, prices[m - 1]))
+        m = compatible[m - 1]
+    return selected
+
+
+def find_cheapest_slots(
+    marketdata,
+    index: PriceIndex,
+    earliest_start: datetime,
+    latest_end: datetime,
+    count: int | None = None,
+    duration: timedelta | None = None,
+    min_block: timedelta | None = None,
+):
+    """Find the cheapest, not necessarily contiguous, slots within a window.
+
+    Either the number of market data entries (count) or the required
+    duration has to be given. Returns a list of (start, end, price) sorted by
+    start time, or an empty list if the window doesn't contain enough data.
+    """
+    slots = _clip_marketdata(marketdata, earliest_start, latest_end)
+
+    if count is not None:
+        selected = _select_by_count(slots, count)
+    elif min_block is None:
+        selected = _select_by_duration(slots, duration)
+    else:
+        selected = _select_by_blocks(slots, duration, min_block, index)
+
+    return sorted(selected, key=itemgetter(0))
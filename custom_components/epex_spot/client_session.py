@@ -0,0 +1,136 @@
+"""aiohttp sessions owned by the integration and shared by all entries."""
+
+from dataclasses import asdict, dataclass
+from importlib.util import find_spec
+import logging
+from types import SimpleNamespace
+
+import aiohttp
+from aiohttp import hdrs
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.util.ssl import (
+    create_no_verify_ssl_context,
+    get_default_context,
+)
+
+from .const import CONF_SOURCE_HOFER_GRUENSTROM, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_CLIENT_SESSIONS = f"{DOMAIN}_client_sessions"
+
+# connections per host, all entries of a source share the same host
+LIMIT_PER_HOST = 4
+# seconds to cache resolved host names
+DNS_CACHE_TTL = 300
+# seconds to keep idle connections open for the next fetch of a burst
+KEEPALIVE_TIMEOUT = 120
+
+TIMEOUT = aiohttp.ClientTimeout(total=60, connect=10, sock_read=30)
+
+# aiohttp only decodes brotli if one of these modules is installed
+HAS_BROTLI = any(find_spec(name) for name in ("brotli", "brotlicffi"))
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+# sources whose certificates are not publicly trusted
+NO_VERIFY_SOURCES = {CONF_SOURCE_HOFER_GRUENSTROM}
+
+
+@dataclass(slots=True)
+class ConnectionStats:
+    requests: int = 0
+    created: int = 0
+    reused: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def _create_trace_config(stats: ConnectionStats) -> aiohttp.TraceConfig:
+    async def on_request_start(session, context: SimpleNamespace, params):
+        stats.requests += 1
+
+    async def on_connection_create_end(session, context: SimpleNamespace, params):
+        stats.created += 1
+
+    async def on_connection_reuseconn(session, context: SimpleNamespace, params):
+        stats.reused += 1
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    return trace_config
+
+
+class ClientSessions:
+    """Tuned client sessions for the price sources.
+
+    The connectors keep connections alive between the fetches of all
+    entries, limit the connections per host and cache DNS lookups. Sources
+    without a trusted certificate get an isolated session which doesn't
+    verify certificates, so no other source shares its connections.
+    """
+
+    def __init__(self):
+        self.stats = ConnectionStats()
+        self._trace_config = _create_trace_config(self.stats)
+        self._session = self._create_session(get_default_context())
+        self._no_verify_session: aiohttp.ClientSession | None = None
+        self.unsub_close: CALLBACK_TYPE | None = None
+
+    def _create_session(self, ssl_context) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit_per_host=LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ssl=ssl_context,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=TIMEOUT,
+            headers={hdrs.ACCEPT_ENCODING: ACCEPT_ENCODING},
+            trace_configs=[self._trace_config],
+        )
+
+    def session_for(self, source: str) -> aiohttp.ClientSession:
+        """Session to be used by the given source."""
+        if source not in NO_VERIFY_SOURCES:
+            return self._session
+        if self._no_verify_session is None:
+            self._no_verify_session = self._create_session(
+                create_no_verify_ssl_context()
+            )
+        return self._no_verify_session
+
+    async def async_close(self):
+        _LOGGER.debug("closing client sessions, connections: %s", self.stats)
+        await self._session.close()
+        if self._no_verify_session is not None:
+            await self._no_verify_session.close()
+
+
+@callback
+def async_get_client_sessions(hass: HomeAssistant) -> ClientSessions:
+    if (sessions := hass.data.get(DATA_CLIENT_SESSIONS)) is None:
+        sessions = hass.data[DATA_CLIENT_SESSIONS] = ClientSessions()
+
+        async def _async_close(_: Event):
+            sessions.unsub_close = None
+            await async_close_client_sessions(hass)
+
+        sessions.unsub_close = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, _async_close
+        )
+    return sessions
+
+
+async def async_close_client_sessions(hass: HomeAssistant):
+    """Close the sessions, on unload of the last entry or shutdown."""
+    if (sessions := hass.data.pop(DATA_CLIENT_SESSIONS, None)) is None:
+        return
+    if sessions.unsub_close is not None:
+        sessions.unsub_close()
+    await sessions.async_close()
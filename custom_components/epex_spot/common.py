@@ -1,7 +1,19 @@
-from datetime import datetime, timedelta
-from typing import List
+import asyncio
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from math import gcd
+from operator import attrgetter
+import threading
+from typing import Any, AsyncIterator, Callable, Hashable, Iterable, List
+from zoneinfo import ZoneInfo
 
-from .const import UOM_EUR_PER_KWH
+import aiohttp
+
+from homeassistant.util.json import json_loads
+
+from .const import EXECUTOR_PAYLOAD_SIZE, READ_CHUNK_SIZE, UOM_EUR_PER_KWH
 
 
 class Marketprice:
@@ -20,7 +32,7 @@ class Marketprice:
         self._unit = unit
 
     def __repr__(self):
-        return f"{self.__class__.__name__}(start: {self._start_time.isoformat()}, end: {self._end_time.isoformat()}, marketprice: {self._market_price_per_kwh} {self._unit})"  # noqa: E501
+        return f"{self.__class__.__name__}(start: {self.start_time.isoformat()}, end: {self.end_time.isoformat()}, marketprice: {self._market_price_per_kwh} {self._unit})"  # noqa: E501
 
     @property
     def start_time(self):
@@ -30,6 +42,14 @@ class Marketprice:
     def end_time(self):
         return self._end_time
 
+    @property
+    def start_timestamp(self) -> float:
+        return self._start_time.timestamp()
+
+    @property
+    def end_timestamp(self) -> float:
+        return self._end_time.timestamp()
+
     def set_end_time(self, end_time):
         self._end_time = end_time
 
@@ -38,48 +58,275 @@ class Marketprice:
         return self._market_price_per_kwh
 
 
-def compress_marketdata(data: List[Marketprice], duration: int) -> List[Marketprice]:
-    entries: List[Marketprice] = []
-    start: Marketprice = None
-    for entry in data:
-        if start is None:
-            start = entry
-            continue
-        is_price_equal = start.market_price_per_kwh == entry.market_price_per_kwh
-        is_continuation = start.end_time == entry.start_time
-        max_start_time = start.start_time + timedelta(minutes=duration)
-        is_same_interval = entry.start_time < max_start_time
-
-        if is_price_equal and is_continuation and is_same_interval:
-            start.set_end_time(entry.end_time)
-        else:
-            entries.append(start)
-            start = entry
-    if start is not None:
-        entries.append(start)
-    return entries
+class EpochMarketprice(Marketprice):
+    """Marketprice based on epoch seconds.
+
+    The datetime objects are only created when start_time or end_time are
+    accessed, consumers which only need the timestamps (like the PriceIndex)
+    never create them.
+    """
+
+    def __init__(
+        self,
+        start_timestamp: float,
+        duration: int,
+        price: float,
+        unit: str = UOM_EUR_PER_KWH,
+    ):
+        self._start_ts = start_timestamp
+        self._end_ts = start_timestamp + duration * 60
+        self._start_time = None
+        self._end_time = None
+        self._market_price_per_kwh = price
+        self._unit = unit
+
+    @property
+    def start_time(self):
+        if self._start_time is None:
+            self._start_time = datetime.fromtimestamp(self._start_ts, tz=timezone.utc)
+        return self._start_time
+
+    @property
+    def end_time(self):
+        if self._end_time is None:
+            self._end_time = datetime.fromtimestamp(self._end_ts, tz=timezone.utc)
+        return self._end_time
+
+    @property
+    def start_timestamp(self) -> float:
+        return self._start_ts
+
+    @property
+    def end_timestamp(self) -> float:
+        return self._end_ts
+
+    def set_end_time(self, end_time):
+        self._end_time = end_time
+        self._end_ts = end_time.timestamp()
+
+
+@lru_cache(maxsize=None)
+def get_tzinfo(key: str) -> tzinfo:
+    """Return a cached time zone object for the given IANA key."""
+    return ZoneInfo(key)
+
+
+def regular_series(
+    start_timestamp: float,
+    duration: int,
+    prices: Iterable[float | None],
+    unit: str = UOM_EUR_PER_KWH,
+) -> List[Marketprice]:
+    """Create entries for consecutive prices of the same duration in minutes.
 
+    The i-th price starts at start_timestamp + i * duration, missing prices
+    (None) are skipped.
+    """
+    step = duration * 60
+    return [
+        EpochMarketprice(start_timestamp + i * step, duration, price, unit)
+        for i, price in enumerate(prices)
+        if price is not None
+    ]
 
-def average_marketdata(
-    data: List[Marketprice], target_duration: int
+
+def _same_entry(a, b) -> bool:
+    return (
+        a.start_timestamp == b.start_timestamp
+        and a.end_timestamp == b.end_timestamp
+        and a.market_price_per_kwh == b.market_price_per_kwh
+    )
+
+
+def merge_marketdata(
+    current: List[Marketprice], new: List[Marketprice]
+) -> tuple[List[Marketprice], bool]:
+    """Merge newly fetched entries into the current list.
+
+    Entries within the time range of the new list are replaced, current
+    entries before and after it are kept. Unchanged entries keep their
+    identity. Eviction is left to the caller, trim the new list to the
+    retained range before merging.
+
+    Returns the merged list and whether any entry has been added, removed
+    or changed its price.
+    """
+    if not new:
+        return current, False
+
+    # current entries overlapping the new list are replaced, including an
+    # entry which starts before the new list but ends within it
+    first = bisect_right(
+        current, new[0].start_timestamp, key=attrgetter("end_timestamp")
+    )
+    last = bisect_left(
+        current, new[-1].end_timestamp, key=attrgetter("start_timestamp")
+    )
+    overlap = current[first:last]
+
+    # skip unchanged entries at the beginning and end of the new list
+    head = 0
+    while (
+        head < len(new)
+        and head < len(overlap)
+        and _same_entry(new[head], overlap[head])
+    ):
+        head += 1
+    tail = 0
+    while (
+        tail < len(new) - head
+        and tail < len(overlap) - head
+        and _same_entry(new[-1 - tail], overlap[-1 - tail])
+    ):
+        tail += 1
+
+    changed_new = new[head : len(new) - tail]
+    changed_old = overlap[head : len(overlap) - tail]
+    if not changed_new and not changed_old:
+        return current, False
+
+    merged = current[: first + head] + changed_new + current[last - tail :]
+    return merged, True
+
+
+def trim_marketdata(
+    data: List[Marketprice], earliest: datetime, latest: datetime
 ) -> List[Marketprice]:
+    """Drop entries which end before earliest or start at or after latest."""
+    first = bisect_right(data, earliest.timestamp(), key=attrgetter("end_timestamp"))
+    last = bisect_left(data, latest.timestamp(), key=attrgetter("start_timestamp"))
+    if first == 0 and last == len(data):
+        return data
+    return data[first:last]
+
+
+def compact_series(
+    data: List[Marketprice], value: Callable[[Marketprice], Any]
+) -> dict[str, Any]:
+    """Encode chronological market data as columnar run-length series.
+
+    The result contains the start time of the first entry, the step in
+    minutes (greatest common divisor of all entry durations), the values
+    and the number of steps each value lasts. Adjacent entries with equal
+    values are merged, gaps are encoded as None. counts is omitted if all
+    values last one step, i.e. the i-th value starts at start + i * step.
+    """
     if not data:
-        return []
+        return {"start": None, "step": None, "values": []}
+
+    step = 0
+    for e in data:
+        step = gcd(step, int((e.end_time - e.start_time).total_seconds()) // 60)
+    step_delta = timedelta(minutes=step)
 
-    entry_duration = int((data[0]._end_time - data[0]._start_time).total_seconds() / 60)
+    values = []
+    counts = []
+    end = data[0].start_time
+    for e in data:
+        if e.start_time > end:
+            values.append(None)
+            counts.append((e.start_time - end) // step_delta)
+        v = value(e)
+        n = (e.end_time - e.start_time) // step_delta
+        if values and values[-1] == v and e.start_time == end:
+            counts[-1] += n
+        else:
+            values.append(v)
+            counts.append(n)
+        end = e.end_time
 
-    group_size = target_duration // entry_duration
+    result = {"start": data[0].start_time, "step": step, "values": values}
+    if any(n != 1 for n in counts):
+        result["counts"] = counts
+    return result
 
-    result: List[Marketprice] = []
 
-    for i in range(0, len(data), group_size):
-        group = data[i : i + group_size]
+class LRUCache:
+    """Least recently used cache with hit/miss counters.
 
-        avg_price = round(sum(e._market_price_per_kwh for e in group) / len(group), 5)
-        start = group[0]._start_time
+    Thread safe, as services may run in the executor.
+    """
 
-        result.append(
-            Marketprice(start_time=start, duration=target_duration, price=avg_price)
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def map_values(self, func: Callable[[Any], Any]):
+        """Replace every value by func(value), keeping the usage order."""
+        with self._lock:
+            for key, value in self._data.items():
+                self._data[key] = func(value)
+
+
+async def parse_payload(payload: str | bytes, parse: Callable, *args) -> Any:
+    """Call parse(payload, *args), in the executor for large payloads.
+
+    Parsing a large response blocks the event loop for a noticeable time
+    on slow hosts, small ones are parsed directly to avoid the overhead.
+    """
+    if len(payload) < EXECUTOR_PAYLOAD_SIZE:
+        return parse(payload, *args)
+    return await asyncio.get_running_loop().run_in_executor(None, parse, payload, *args)
+
+
+class ResponseTooLargeError(aiohttp.ClientPayloadError):
+    """The response body exceeds the maximum size of the source."""
+
+
+async def iter_body(
+    resp: aiohttp.ClientResponse, max_size: int, chunk_size: int = READ_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Yield the decompressed response body in chunks of up to chunk_size.
+
+    Responses announcing more than max_size bytes are rejected before
+    reading, compressed responses are checked while they are streamed.
+    """
+    if resp.content_length is not None and resp.content_length > max_size:
+        raise ResponseTooLargeError(
+            f"{resp.url}: content length {resp.content_length} exceeds {max_size}"
         )
 
-    return result
+    size = 0
+    async for chunk in resp.content.iter_chunked(chunk_size):
+        size += len(chunk)
+        if size > max_size:
+            raise ResponseTooLargeError(f"{resp.url}: body exceeds {max_size}")
+        yield chunk
+
+
+async def read_body(resp: aiohttp.ClientResponse, max_size: int) -> bytes:
+    """Read the decompressed response body, at most max_size bytes."""
+    return b"".join([chunk async for chunk in iter_body(resp, max_size)])
+
+
+async def read_json(resp: aiohttp.ClientResponse, max_size: int) -> Any:
+    """Read and decode a JSON response body, at most max_size bytes."""
+    return await parse_payload(await read_body(resp, max_size), json_loads)
@@ -8,9 +8,17 @@ from typing import List, Tuple
 
 from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlowWithReload
 from homeassistant.core import callback
+import homeassistant.helpers.config_validation as cv
 
 from .const import (
+    CONF_DATA_FORMAT,
+    CONF_EXPOSE_DATA,
+    CONF_EXTRA_DURATIONS,
     CONF_MARKET_AREA,
+    CONF_PEAK_END,
+    CONF_PEAK_START,
+    CONF_RETENTION_FUTURE,
+    CONF_RETENTION_PAST,
     CONF_SOURCE,
     CONF_SOURCE_AWATTAR,
     CONF_SOURCE_ENTSOE,
@@ -26,7 +34,16 @@ from .const import (
     CONF_TOKEN,
     CONF_DURATION,
     CONFIG_VERSION,
+    DATA_FORMATS,
+    DEFAULT_DATA_FORMAT,
     DEFAULT_DURATION,
+    DEFAULT_EXPOSE_DATA,
+    DEFAULT_EXTRA_DURATIONS,
+    EXTRA_DURATIONS,
+    DEFAULT_PEAK_END,
+    DEFAULT_PEAK_START,
+    DEFAULT_RETENTION_FUTURE,
+    DEFAULT_RETENTION_PAST,
     DEFAULT_SURCHARGE_ABS,
     DEFAULT_SURCHARGE_PERC,
     DEFAULT_TAX,
@@ -161,8 +178,17 @@ class EpexSpotOptionsFlow(OptionsFlowWithReload):
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if user_input[CONF_PEAK_END] <= user_input[CONF_PEAK_START]:
+                errors[CONF_PEAK_END] = "peak_end_before_start"
+            if any(
+                int(d) <= int(user_input[CONF_DURATION])
+                for d in user_input.get(CONF_EXTRA_DURATIONS, [])
+            ):
+                errors[CONF_EXTRA_DURATIONS] = "extra_duration_not_coarser"
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
 
         _, durations, _ = getParametersForSource(
             self.config_entry.data.get(CONF_SOURCE)
@@ -194,8 +220,57 @@ class EpexSpotOptionsFlow(OptionsFlowWithReload):
                             CONF_DURATION, DEFAULT_DURATION
                         ),
                     ): vol.In(durations),
+                    vol.Optional(
+                        CONF_RETENTION_PAST,
+                        default=self.config_entry.options.get(
+                            CONF_RETENTION_PAST, DEFAULT_RETENTION_PAST
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_RETENTION_FUTURE,
+                        default=self.config_entry.options.get(
+                            CONF_RETENTION_FUTURE, DEFAULT_RETENTION_FUTURE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=24)),
+                    vol.Optional(
+                        CONF_PEAK_START,
+                        default=self.config_entry.options.get(
+                            CONF_PEAK_START, DEFAULT_PEAK_START
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=23)),
+                    vol.Optional(
+                        CONF_PEAK_END,
+                        default=self.config_entry.options.get(
+                            CONF_PEAK_END, DEFAULT_PEAK_END
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=24)),
+                    vol.Optional(
+                        CONF_EXPOSE_DATA,
+                        default=self.config_entry.options.get(
+                            CONF_EXPOSE_DATA, DEFAULT_EXPOSE_DATA
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_DATA_FORMAT,
+                        default=self.config_entry.options.get(
+                            CONF_DATA_FORMAT, DEFAULT_DATA_FORMAT
+                        ),
+                    ): vol.In(DATA_FORMATS),
+                    vol.Optional(
+                        CONF_EXTRA_DURATIONS,
+                        default=self.config_entry.options.get(
+                            CONF_EXTRA_DURATIONS, DEFAULT_EXTRA_DURATIONS
+                        ),
+                    ): cv.multi_select(
+                        {
+                            str(d): f"{d} min"
+                            for d in EXTRA_DURATIONS
+                            if d > min(durations)
+                        }
+                    ),
                 }
             ),
+            errors=errors,
         )
 
 
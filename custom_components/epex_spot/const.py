@@ -11,6 +11,11 @@ ATTR_SELL_VOLUME_MWH = "sell_volume_mwh"
 ATTR_VOLUME_MWH = "volume_mwh"
 ATTR_RANK = "rank"
 ATTR_QUANTILE = "quantile"
+ATTR_COUNT = "count"
+ATTR_MINIMUM = "minimum"
+ATTR_MEDIAN = "median"
+ATTR_MAXIMUM = "maximum"
+ATTR_THRESHOLD = "threshold"
 ATTR_PRICE_PER_KWH = "price_per_kwh"
 
 CONFIG_VERSION = 2
@@ -33,17 +38,94 @@ CONF_SURCHARGE_PERC = "percentage_surcharge"
 CONF_SURCHARGE_ABS = "absolute_surcharge"
 CONF_TAX = "tax"
 
+# configuration options for retention of market data
+CONF_RETENTION_PAST = "retention_past"
+CONF_RETENTION_FUTURE = "retention_future"
+
+# configuration options for the peak hours of the aggregate table
+CONF_PEAK_START = "peak_start"
+CONF_PEAK_END = "peak_end"
+
+# configuration option to expose all prices as sensor attribute
+CONF_EXPOSE_DATA = "expose_data"
+
+# configuration option for the encoding of the data attribute
+CONF_DATA_FORMAT = "data_format"
+DATA_FORMAT_LIST = "list"
+DATA_FORMAT_COMPACT = "compact"
+DATA_FORMATS = [DATA_FORMAT_LIST, DATA_FORMAT_COMPACT]
+
+# configuration option for additional sensors with a coarser resolution
+CONF_EXTRA_DURATIONS = "extra_durations"
+EXTRA_DURATIONS = (30, 60)
+
 # service call
 CONF_EARLIEST_START_TIME = "earliest_start"
 CONF_EARLIEST_START_POST = "earliest_start_post"
 CONF_LATEST_END_TIME = "latest_end"
 CONF_LATEST_END_POST = "latest_end_post"
 CONF_DURATION = "duration"
+CONF_INTERVALS = "intervals"
+CONF_NAME = "name"
+CONF_CMP = "cmp"
+CONF_SLOTS = "slots"
+CONF_MIN_BLOCK = "min_block"
+CONF_PROFILE = "profile"
+CONF_PROFILE_INTERVAL = "profile_interval"
+CONF_CAPACITY = "capacity"
+CONF_STATE_OF_CHARGE = "state_of_charge"
+CONF_MAX_CHARGE_POWER = "max_charge_power"
+CONF_MAX_DISCHARGE_POWER = "max_discharge_power"
+CONF_EFFICIENCY = "efficiency"
+CONF_JOBS = "jobs"
+CONF_POWER = "power"
+CONF_MAX_POWER = "max_power"
+CONF_START = "start"
+CONF_END = "end"
+CONF_RESOLUTION = "resolution"
+CONF_FIELDS = "fields"
+CONF_THRESHOLD = "threshold"
+CONF_MIN_DURATION = "min_duration"
+CONF_PARALLEL = "parallel"
+
+PRICE_FIELD_MARKET = "market_price_per_kwh"
+PRICE_FIELD_TOTAL = "total_price_per_kwh"
+PRICE_FIELDS = (PRICE_FIELD_MARKET, PRICE_FIELD_TOTAL)
+CONF_SECONDS = "seconds"
 
 DEFAULT_SURCHARGE_PERC = 3.0
 DEFAULT_SURCHARGE_ABS = 0.1193
 DEFAULT_TAX = 19.0
 DEFAULT_DURATION = 60
+DEFAULT_RETENTION_PAST = 24  # hours
+DEFAULT_RETENTION_FUTURE = 72  # hours
+DEFAULT_PEAK_START = 8  # hour of the day, local time
+DEFAULT_PEAK_END = 20  # hour of the day, local time
+DEFAULT_EXPOSE_DATA = True
+DEFAULT_DATA_FORMAT = DATA_FORMAT_LIST
+DEFAULT_EXTRA_DURATIONS = []
+DEFAULT_PROFILE_SECONDS = 60.0
+DEFAULT_PROFILE_INTERVAL = 15  # minutes
+DEFAULT_EFFICIENCY = 90.0  # percent, round trip
+
+# number of cached price interval service results per config entry
+INTERVAL_CACHE_SIZE = 128
+
+# responses larger than this (bytes or characters) are parsed in the executor
+EXECUTOR_PAYLOAD_SIZE = 64 * 1024
+
+# services are run in the executor if the number of market data entries
+# multiplied with the number of requests/jobs/levels exceeds this
+EXECUTOR_PROBLEM_SIZE = 2000
+
+# size of the chunks in which response bodies are read
+READ_CHUNK_SIZE = 64 * 1024
+
+# number of cached threshold indexes per config entry
+THRESHOLD_INDEX_CACHE_SIZE = 8
+
+# lengths of the rolling windows of the rank and quantile sensors
+ROLLING_WINDOW_HOURS = (12, 24)
 
 EMPTY_EXTREME_PRICE_INTERVAL_RESP = {
     "start": None,
@@ -52,6 +134,37 @@ EMPTY_EXTREME_PRICE_INTERVAL_RESP = {
     "total_price_per_kwh": None,
 }
 
+EMPTY_CHEAPEST_SLOTS_RESP = {
+    "slots": [],
+    "market_price_per_kwh": None,
+    "total_price_per_kwh": None,
+    "market_price": None,
+    "total_price": None,
+}
+
+EMPTY_PRICE_PROFILE_RESP = {
+    "start": None,
+    "end": None,
+    "energy_kwh": None,
+    "market_price": None,
+    "total_price": None,
+    "slots": [],
+}
+
+EMPTY_THRESHOLD_RUN_RESP = {
+    "start": None,
+    "end": None,
+    "market_price_per_kwh": None,
+    "total_price_per_kwh": None,
+}
+
+EMPTY_BATTERY_SCHEDULE_RESP = {
+    "schedule": [],
+    "charged_kwh": None,
+    "discharged_kwh": None,
+    "savings": None,
+}
+
 TIMEZONE_HOFER_GRUENSTROM = "Europe/Vienna"
 
 UOM_EUR_PER_KWH = "€/kWh"
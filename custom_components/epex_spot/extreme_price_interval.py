@@ -1,5 +1,7 @@
-import logging
+from bisect import bisect_left, bisect_right
 from datetime import datetime, time, timedelta
+import logging
+import operator
 
 import homeassistant.util.dt as dt_util
 
@@ -7,40 +9,102 @@ _LOGGER = logging.getLogger(__name__)
 
 SECONDS_PER_HOUR = 60 * 60
 
+CMP_FUNCTIONS = {
+    "lowest": operator.lt,
+    "highest": operator.gt,
+}
+
 
-def _find_market_price(marketdata, dt: datetime):
-    for mp in marketdata:
-        if dt >= mp.start_time and dt < mp.end_time:
-            return mp
+class PriceIndex:
+    """Prefix sums over marketdata for fast interval price calculation.
+
+    The index is built once per data set and shared by all interval
+    queries. Times are stored as POSIX timestamps.
+    """
 
-    return None
+    def __init__(self, starts: list[float], ends: list[float], prices: list[float]):
+        self._starts = starts
+        self._ends = ends
+        self._prices = prices
+
+        # accumulated price (price * hours) up to the start of each entry
+        self._accumulated = [0.0]
+        # entries with the same run id are contiguous
+        self._runs = []
+        run = 0
+        for i, price in enumerate(prices):
+            if i > 0 and starts[i] != ends[i - 1]:
+                run += 1
+            self._runs.append(run)
+            self._accumulated.append(
+                self._accumulated[-1] + price * (ends[i] - starts[i]) / SECONDS_PER_HOUR
+            )
+
+    @classmethod
+    def from_marketdata(cls, marketdata):
+        return cls(
+            [e.start_timestamp for e in marketdata],
+            [e.end_timestamp for e in marketdata],
+            [e.market_price_per_kwh for e in marketdata],
+        )
 
+    def __len__(self):
+        return len(self._prices)
+
+    def trimmed(self, ts: float) -> "PriceIndex":
+        """Index without the entries which end at or before ts.
+
+        Only differences of the accumulated prices are used, so they are
+        sliced instead of recalculated.
+        """
+        first = bisect_right(self._ends, ts)
+        if first == 0:
+            return self
+        index = self.__class__.__new__(self.__class__)
+        index._starts = self._starts[first:]
+        index._ends = self._ends[first:]
+        index._prices = self._prices[first:]
+        index._accumulated = self._accumulated[first:]
+        index._runs = self._runs[first:]
+        return index
+
+    def _accumulated_price(self, ts: float, index: int) -> float:
+        return (
+            self._accumulated[index]
+            + self._prices[index] * (ts - self._starts[index]) / SECONDS_PER_HOUR
+        )
 
-def _calc_interval_price(marketdata, start_time: datetime, duration: timedelta):
-    """Calculate price for given start time and duration."""
-    total_price = 0
-    stop_time = start_time + duration
+    def _integrate(self, start: float, stop: float) -> float | None:
+        first = bisect_right(self._starts, start) - 1
+        if first < 0 or start >= self._ends[first]:
+            return None
 
-    while start_time < stop_time:
-        mp = _find_market_price(marketdata, start_time)
+        last = bisect_left(self._ends, stop)
+        if last >= len(self._ends) or stop < self._starts[last]:
+            return None
 
-        if mp.end_time > stop_time:
-            active_duration_in_this_segment = stop_time - start_time
-        else:
-            active_duration_in_this_segment = mp.end_time - start_time
+        if self._runs[first] != self._runs[last]:
+            return None
 
-        total_price += (
-            mp.market_price_per_kwh
-            * active_duration_in_this_segment.total_seconds()
-            / SECONDS_PER_HOUR
+        return self._accumulated_price(stop, last) - self._accumulated_price(
+            start, first
         )
 
-        start_time = mp.end_time
+    def interval_price(self, start: float, stop: float) -> float | None:
+        """Calculate price for given start and stop timestamp.
 
-    return round(total_price, 6)
+        Returns None if the interval is not completely covered by market data.
+        """
+        price = self._integrate(start, stop)
+        return None if price is None else round(price, 6)
 
+    def average_price(self, start: float, stop: float) -> float | None:
+        """Calculate the average price per kWh between start and stop."""
+        price = self._integrate(start, stop)
+        return None if price is None else price * SECONDS_PER_HOUR / (stop - start)
 
-def _calc_start_times(
+
+def calc_start_times(
     marketdata, earliest_start: datetime, latest_end: datetime, duration: timedelta
 ):
     """Calculate list of meaningful start times."""
@@ -69,20 +133,25 @@ def _calc_start_times(
     return sorted(start_times)
 
 
-def find_extreme_price_interval(marketdata, start_times, duration: timedelta, cmp):
+def find_extreme_price_interval(
+    index: PriceIndex, start_times, duration: timedelta, cmp
+):
     """Find the lowest/highest price for all given start times.
 
-        The argument cmp is a lambda which is used to differentiate between
+        The argument cmp is a function which is used to differentiate between
     lowest and highest price.
     """
     interval_price: float | None = None
     interval_start_time: timedelta | None = None
+    duration_seconds = duration.total_seconds()
 
     for start_time in start_times:
-        ip = _calc_interval_price(marketdata, start_time, duration)
+        start = start_time.timestamp()
+        ip = index.interval_price(start, start + duration_seconds)
 
         if ip is None:
-            return None
+            # interval not covered by market data
+            continue
 
         if interval_price is None or cmp(ip, interval_price):
             interval_price = ip
@@ -91,11 +160,16 @@ def find_extreme_price_interval(marketdata, start_times, duration: timedelta, cm
     if interval_start_time is None:
         return None
 
+    return interval_result(interval_start_time, interval_price, duration)
+
+
+def interval_result(start_time: datetime, interval_price: float, duration: timedelta):
+    """Result of find_extreme_price_interval for the found start time."""
     interval_price = round(interval_price, 6)
 
     return {
-        "start": dt_util.as_local(interval_start_time),
-        "end": dt_util.as_local(interval_start_time + duration),
+        "start": dt_util.as_local(start_time),
+        "end": dt_util.as_local(start_time + duration),
         "interval_price": interval_price,
         "market_price_per_hour": round(
             interval_price * SECONDS_PER_HOUR / duration.total_seconds(), 6
@@ -103,17 +177,18 @@ def find_extreme_price_interval(marketdata, start_times, duration: timedelta, cm
     }
 
 
-def get_start_times(
-    marketdata,
+def get_interval_window(
     earliest_start_time: time,
     earliest_start_post: int,
     latest_end_time: time,
     latest_end_post: int,
     latest_market_datetime: datetime,
-    duration: timedelta,
-):
-    # first calculate start and end datetime
-    now = dt_util.now()
+) -> tuple[datetime, datetime] | None:
+    """Resolve earliest start and latest end to UTC datetimes.
+
+    Returns None if no market data is available for the window yet.
+    """
+    now = dt_util.now().replace(microsecond=0)
 
     earliest_start: datetime = (
         now
@@ -149,7 +224,7 @@ def get_start_times(
                 _LOGGER.debug(
                     f"no data available yet: earliest_start={earliest_start}, latest_end={latest_end}"  # noqa: E501
                 )
-                return []
+                return None
 
             latest_end = latest_market_datetime
 
@@ -162,9 +237,4 @@ def get_start_times(
         f"extreme price service call: earliest_start={earliest_start}, latest_end={latest_end}"  # noqa: E501
     )
 
-    return _calc_start_times(
-        marketdata,
-        earliest_start=dt_util.as_utc(earliest_start),
-        latest_end=dt_util.as_utc(latest_end),
-        duration=duration,
-    )
+    return dt_util.as_utc(earliest_start), dt_util.as_utc(latest_end)
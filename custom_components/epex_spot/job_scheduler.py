@@ -0,0 +1,110 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from .extreme_price_interval import PriceIndex
+
+# maximum number of improvement rounds after the initial greedy placement
+MAX_REPAIR_ROUNDS = 5
+
+
+@dataclass(slots=True)
+class Job:
+    name: str
+    duration: timedelta
+    power: float
+    earliest_start: datetime | None
+    latest_end: datetime | None
+    start_times: list[datetime]
+    start: datetime | None = None
+    price: float | None = None
+    _costs: dict[datetime, float | None] = field(default_factory=dict)
+
+    @property
+    def end(self) -> datetime | None:
+        return None if self.start is None else self.start + self.duration
+
+    def cost(self, index: PriceIndex, start: datetime) -> float | None:
+        """Price for running the job at the given start time (cached)."""
+        if start not in self._costs:
+            ts = start.timestamp()
+            price = index.interval_price(ts, ts + self.duration.total_seconds())
+            self._costs[start] = None if price is None else price * self.power
+        return self._costs[start]
+
+
+def _peak_load(jobs: list[Job], start: datetime, end: datetime) -> float:
+    """Maximum power of all scheduled jobs within [start, end)."""
+    events = []
+    for job in jobs:
+        if job.start is not None and job.start < end and job.end > start:
+            events.append((max(job.start, start), job.power))
+            events.append((job.end, -job.power))
+    # process job ends before job starts at the same time
+    events.sort(key=lambda e: (e[0], e[1]))
+
+    load = 0
+    peak = 0
+    for _, power in events:
+        load += power
+        peak = max(peak, load)
+    return peak
+
+
+def _candidates(job: Job, others: list[Job]) -> list[datetime]:
+    """Start times of the job, including those adjacent to other jobs."""
+    if not job.start_times:
+        # no market data available within the window of the job
+        return []
+
+    candidates = set(job.start_times)
+    for other in others:
+        if other.start is None:
+            continue
+        for start in (other.end, other.start - job.duration):
+            if job.earliest_start <= start and start + job.duration <= job.latest_end:
+                candidates.add(start)
+    return sorted(candidates)
+
+
+def _place(job: Job, jobs: list[Job], index: PriceIndex, max_power: float):
+    """Place the job at its cheapest start time which fits into max_power."""
+    others = [j for j in jobs if j is not job]
+    best_start = None
+    best_cost = None
+    for start in _candidates(job, others):
+        cost = job.cost(index, start)
+        if cost is None or (best_cost is not None and cost >= best_cost):
+            continue
+        if _peak_load(others, start, start + job.duration) + job.power > max_power:
+            continue
+        best_start = start
+        best_cost = cost
+
+    job.start = best_start
+    job.price = best_cost
+
+
+def schedule_jobs(jobs: list[Job], index: PriceIndex, max_power: float):
+    """Assign start times to all jobs, minimizing the total price.
+
+    The jobs are placed greedily, largest energy first, at their cheapest
+    start time which keeps the total power below max_power. Afterwards each
+    job is removed and placed again, until no job moves anymore, which
+    repairs jobs that couldn't be placed and improves the total price.
+    Jobs which can't be placed keep start None.
+    """
+    for job in sorted(jobs, key=lambda j: -j.power * j.duration.total_seconds()):
+        _place(job, jobs, index, max_power)
+
+    for _ in range(MAX_REPAIR_ROUNDS):
+        moved = False
+        for job in jobs:
+            previous = job.start
+            job.start = None
+            _place(job, jobs, index, max_power)
+            if job.start != previous:
+                moved = True
+        if not moved:
+            break
+
+    return jobs
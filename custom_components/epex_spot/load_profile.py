@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+import math
+from operator import mul
+
+from .extreme_price_interval import PriceIndex
+
+
+def _cell_prices(index: PriceIndex, first: float, count: int, step: float):
+    """Average price per kWh of each grid cell, None if not covered."""
+    return [
+        index.average_price(first + i * step, first + (i + 1) * step)
+        for i in range(count)
+    ]
+
+
+def find_lowest_price_profile(
+    index: PriceIndex,
+    earliest_start: datetime,
+    latest_end: datetime,
+    profile: list[float],
+    profile_interval: timedelta,
+):
+    """Find the start time with the lowest cost for a power profile.
+
+    The profile contains the power in kW for consecutive sub-intervals of
+    length profile_interval. Candidate start times are all multiples of
+    profile_interval within the window. The cost of all candidates is the
+    cross-correlation of the profile with the price of each grid cell, which
+    is O(n * m) for n cells and m profile entries.
+
+    Returns a tuple of start time and the price per kWh of each
+    sub-interval, or None if no candidate is completely covered by market
+    data.
+    """
+    step = profile_interval.total_seconds()
+    first = math.ceil(earliest_start.timestamp() / step) * step
+    count = int((latest_end.timestamp() - first) // step)
+    width = len(profile)
+    if count < width:
+        return None
+
+    cells = _cell_prices(index, first, count, step)
+
+    # number of uncovered cells up to each position, to skip candidates
+    # which are not completely covered by market data
+    gaps = [0, *accumulate(c is None for c in cells)]
+
+    best_cost = None
+    best_pos = None
+    for pos in range(count - width + 1):
+        if gaps[pos + width] != gaps[pos]:
+            continue
+        cost = sum(map(mul, profile, cells[pos : pos + width]))
+        if best_cost is None or cost < best_cost:
+            best_cost = cost
+            best_pos = pos
+
+    if best_pos is None:
+        return None
+
+    start = datetime.fromtimestamp(first + best_pos * step, tz=timezone.utc)
+    return start, cells[best_pos : best_pos + width]
@@ -0,0 +1,119 @@
+from bisect import bisect_left
+
+from .extreme_price_interval import SECONDS_PER_HOUR
+
+
+class FenwickTree:
+    """Counts per index with O(log n) updates, prefix sums and k-th lookups."""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._tree = [0] * (size + 1)
+        # highest power of two <= size, start of the binary search in find
+        self._top = 1 << (size.bit_length() - 1) if size else 0
+
+    def add(self, index: int, delta: int):
+        i = index + 1
+        while i <= self._size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index: int) -> int:
+        """Sum of the counts of all indices < index."""
+        total = 0
+        i = index
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, k: int) -> int:
+        """Index of the k-th (0 based) counted element."""
+        pos = 0
+        step = self._top
+        while step:
+            nxt = pos + step
+            if nxt <= self._size and self._tree[nxt] <= k:
+                pos = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return pos
+
+
+class RollingOrderStatistics:
+    """Order statistics of all prices within a window moving with time.
+
+    The window contains all entries starting within [start, start + hours).
+    The prices are compressed to their position among the distinct prices
+    of the market data and counted in a Fenwick tree, so moving the window
+    forward costs O(log n) per expiring or arriving entry, and ranks and
+    percentiles are answered in O(log n) without sorting the window.
+    Built once per market data version.
+    """
+
+    def __init__(self, marketdata, hours: int):
+        self._starts = [e.start_timestamp for e in marketdata]
+        self._prices = sorted({e.market_price_per_kwh for e in marketdata})
+        self._index = [
+            bisect_left(self._prices, e.market_price_per_kwh) for e in marketdata
+        ]
+        self._length = hours * SECONDS_PER_HOUR
+        self._tree = FenwickTree(len(self._prices))
+        self._start = None
+        # entries [first, end) are counted in the tree
+        self._first = 0
+        self._end = 0
+        self._count = 0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def advance(self, start: float):
+        """Move the window to start at the given timestamp."""
+        if self._start is not None and start < self._start:
+            # the window only moves forward in time, start over
+            self._tree = FenwickTree(len(self._prices))
+            self._first = self._end = self._count = 0
+        self._start = start
+
+        starts = self._starts
+        while self._first < len(starts) and starts[self._first] < start:
+            if self._first < self._end:
+                self._tree.add(self._index[self._first], -1)
+                self._count -= 1
+            self._first += 1
+
+        self._end = max(self._end, self._first)
+        end = start + self._length
+        while self._end < len(starts) and starts[self._end] < end:
+            self._tree.add(self._index[self._end], 1)
+            self._count += 1
+            self._end += 1
+
+    def rank(self, price: float) -> int:
+        """Number of prices within the window lower than price."""
+        return self._tree.prefix_sum(bisect_left(self._prices, price))
+
+    def kth(self, k: int) -> float:
+        """The k-th (0 based) lowest price within the window."""
+        return self._prices[self._tree.find(k)]
+
+    @property
+    def minimum(self) -> float | None:
+        return self.kth(0) if self._count else None
+
+    @property
+    def maximum(self) -> float | None:
+        return self.kth(self._count - 1) if self._count else None
+
+    def percentile(self, q: float) -> float | None:
+        """Percentile with linear interpolation between the closest ranks."""
+        if not self._count:
+            return None
+        pos = q * (self._count - 1)
+        lower = int(pos)
+        fraction = pos - lower
+        if fraction == 0:
+            return self.kth(lower)
+        return self.kth(lower) * (1 - fraction) + self.kth(lower + 1) * fraction
@@ -0,0 +1,112 @@
+from bisect import bisect_left
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from operator import attrgetter
+
+# windows of the aggregate table
+WINDOW_TODAY = "today"
+WINDOW_TOMORROW = "tomorrow"
+WINDOW_NEXT_24H = "next_24h"
+WINDOW_PEAK = "peak"
+WINDOW_OFF_PEAK = "off_peak"
+
+
+@dataclass(frozen=True, slots=True)
+class PriceStatistics:
+    count: int
+    minimum: float
+    maximum: float
+    mean: float
+    median: float
+    p10: float
+    p25: float
+    p75: float
+    p90: float
+
+    @classmethod
+    def from_prices(cls, prices: list[float]) -> "PriceStatistics | None":
+        """Statistics of the given prices, None if there are no prices."""
+        if not prices:
+            return None
+
+        s = sorted(prices)
+        n = len(s)
+        mid = n // 2
+        return cls(
+            count=n,
+            minimum=s[0],
+            maximum=s[-1],
+            mean=sum(s) / n,
+            median=s[mid] if n % 2 else (s[mid - 1] + s[mid]) / 2,
+            p10=_percentile(s, 0.10),
+            p25=_percentile(s, 0.25),
+            p75=_percentile(s, 0.75),
+            p90=_percentile(s, 0.90),
+        )
+
+    def as_dict(self) -> dict[str, float]:
+        return asdict(self)
+
+
+def _percentile(sorted_prices: list[float], q: float) -> float:
+    """Percentile with linear interpolation between the closest ranks."""
+    pos = q * (len(sorted_prices) - 1)
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_prices) - 1)
+    fraction = pos - lower
+    return sorted_prices[lower] * (1 - fraction) + sorted_prices[upper] * fraction
+
+
+def _window_prices(marketdata, start: datetime, end: datetime) -> list[float]:
+    """Prices of all entries completely within [start, end)."""
+    prices = []
+    end_ts = end.timestamp()
+    first = bisect_left(
+        marketdata, start.timestamp(), key=attrgetter("start_timestamp")
+    )
+    for e in marketdata[first:]:
+        if e.end_timestamp > end_ts:
+            break
+        prices.append(e.market_price_per_kwh)
+    return prices
+
+
+def _hour_of_day(start_of_day: datetime, end_of_day: datetime, hour: int):
+    return end_of_day if hour == 24 else start_of_day.replace(hour=hour)
+
+
+def calc_daily_statistics(
+    marketdata, start_of_day: datetime, peak_start_hour: int, peak_end_hour: int
+):
+    """Statistics of the windows which only change with the day or data.
+
+    Peak hours are [peak_start_hour, peak_end_hour) of today in local time.
+    """
+    end_of_day = start_of_day + timedelta(days=1)
+    peak_start = _hour_of_day(start_of_day, end_of_day, peak_start_hour)
+    peak_end = _hour_of_day(start_of_day, end_of_day, peak_end_hour)
+
+    return {
+        WINDOW_TODAY: PriceStatistics.from_prices(
+            _window_prices(marketdata, start_of_day, end_of_day)
+        ),
+        WINDOW_TOMORROW: PriceStatistics.from_prices(
+            _window_prices(marketdata, end_of_day, end_of_day + timedelta(days=1))
+        ),
+        WINDOW_PEAK: PriceStatistics.from_prices(
+            _window_prices(marketdata, peak_start, peak_end)
+        ),
+        WINDOW_OFF_PEAK: PriceStatistics.from_prices(
+            _window_prices(marketdata, start_of_day, peak_start)
+            + _window_prices(marketdata, peak_end, end_of_day)
+        ),
+    }
+
+
+def calc_rolling_statistics(marketdata, start: datetime):
+    """Statistics of the windows which move with the current entry."""
+    return {
+        WINDOW_NEXT_24H: PriceStatistics.from_prices(
+            _window_prices(marketdata, start, start + timedelta(hours=24))
+        ),
+    }
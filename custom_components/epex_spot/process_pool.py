@@ -0,0 +1,154 @@
+"""Optional process pool for large batches of price interval searches."""
+
+import asyncio
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+import os
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .extreme_price_interval import CMP_FUNCTIONS, PriceIndex
+
+DATA_PROCESS_POOL = f"{DOMAIN}_process_pool"
+
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# minimum number of start times per task
+MIN_CHUNK_SIZE = 1000
+
+# batches with less start times are searched in-process
+MIN_PARALLEL_START_TIMES = 2 * MIN_CHUNK_SIZE
+
+# price index of the shared market data, per worker process
+_worker_index: tuple[str, PriceIndex] | None = None
+
+
+def _load_index(name: str, length: int) -> PriceIndex:
+    """Build the price index from shared memory, once per market data."""
+    global _worker_index  # pylint: disable=global-statement
+    if _worker_index is None or _worker_index[0] != name:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+        try:
+            with shm.buf[: 3 * length * 8] as raw, raw.cast("d") as view:
+                values = view.tolist()
+        finally:
+            shm.close()
+        index = PriceIndex(
+            values[:length], values[length : 2 * length], values[2 * length :]
+        )
+        _worker_index = (name, index)
+    return _worker_index[1]
+
+
+def _find_extreme(
+    name: str, length: int, start_times: list[float], duration: float, cmp_name: str
+) -> tuple[int | None, float | None]:
+    """Position and price of the extreme interval, runs in a worker."""
+    index = _load_index(name, length)
+    cmp = CMP_FUNCTIONS[cmp_name]
+    best = None
+    best_price = None
+    for i, start in enumerate(start_times):
+        ip = index.interval_price(start, start + duration)
+        if ip is None:
+            continue
+        if best_price is None or cmp(ip, best_price):
+            best = i
+            best_price = ip
+    return best, best_price
+
+
+class IntervalProcessPool:
+    """Search the start times of interval requests in worker processes.
+
+    The market data is passed to the workers once per batch as shared
+    memory arrays instead of pickling it for every task. The start times
+    are split into ordered chunks, whose results are merged in order, so
+    ties resolve to the earliest start time like the in-process search.
+    """
+
+    def __init__(self):
+        # spawn, as forking the multi-threaded Home Assistant process is unsafe
+        self._executor = ProcessPoolExecutor(
+            MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def async_find_extremes(
+        self, marketdata, queries: list[tuple[list[datetime], timedelta, str]]
+    ) -> list[tuple[datetime, float] | None]:
+        """Find the extreme interval of each (start_times, duration, cmp)."""
+        length = len(marketdata)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, 3 * length * 8))
+        try:
+            with shm.buf[: 3 * length * 8] as raw, raw.cast("d") as values:
+                values[:length] = array("d", (e.start_timestamp for e in marketdata))
+                values[length : 2 * length] = array(
+                    "d", (e.end_timestamp for e in marketdata)
+                )
+                values[2 * length :] = array(
+                    "d", (e.market_price_per_kwh for e in marketdata)
+                )
+
+            return await asyncio.gather(
+                *(self._async_find_extreme(shm.name, length, *q) for q in queries)
+            )
+        finally:
+            shm.close()
+            shm.unlink()
+
+    async def _async_find_extreme(
+        self,
+        name: str,
+        length: int,
+        start_times: list[datetime],
+        duration: timedelta,
+        cmp_name: str,
+    ) -> tuple[datetime, float] | None:
+        loop = asyncio.get_running_loop()
+        timestamps = [t.timestamp() for t in start_times]
+        chunk_size = max(MIN_CHUNK_SIZE, math.ceil(len(timestamps) / MAX_WORKERS))
+        offsets = range(0, len(timestamps), chunk_size)
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    self._executor,
+                    _find_extreme,
+                    name,
+                    length,
+                    timestamps[offset : offset + chunk_size],
+                    duration.total_seconds(),
+                    cmp_name,
+                )
+                for offset in offsets
+            )
+        )
+
+        cmp = CMP_FUNCTIONS[cmp_name]
+        best = None
+        best_price = None
+        for offset, (i, price) in zip(offsets, results):
+            if i is not None and (best_price is None or cmp(price, best_price)):
+                best = offset + i
+                best_price = price
+        return None if best is None else (start_times[best], best_price)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@callback
+def async_get_process_pool(hass: HomeAssistant) -> IntervalProcessPool:
+    if (pool := hass.data.get(DATA_PROCESS_POOL)) is None:
+        pool = hass.data[DATA_PROCESS_POOL] = IntervalProcessPool()
+    return pool
+
+
+@callback
+def async_shutdown_process_pool(hass: HomeAssistant):
+    if (pool := hass.data.pop(DATA_PROCESS_POOL, None)) is not None:
+        pool.shutdown()
@@ -0,0 +1,64 @@
+"""Opt-in profiling of a running EPEX Spot integration."""
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+_profile_lock = asyncio.Lock()
+
+
+async def async_profile(hass: HomeAssistant, seconds: float) -> dict[str, str]:
+    """Profile the event loop for the given number of seconds.
+
+    All integration code (fetch, update_time, state writes and service
+    calls) runs on the event loop thread, so a profiler enabled there
+    captures it in place. The raw stats are written into the config dir,
+    together with a text summary restricted to this integration and, if
+    pyprof2calltree is available, a callgrind file.
+    """
+    if _profile_lock.locked():
+        raise HomeAssistantError("Profiling is already running")
+
+    async with _profile_lock:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+
+        basename = hass.config.path(f"{DOMAIN}_profile.{int(time.time())}")
+        return await hass.async_add_executor_job(_write_profile, profiler, basename)
+
+
+def _write_profile(profiler: cProfile.Profile, basename: str) -> dict[str, str]:
+    files = {"stats": f"{basename}.cprof", "summary": f"{basename}.txt"}
+
+    profiler.dump_stats(files["stats"])
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(DOMAIN)
+    with open(files["summary"], "w", encoding="utf-8") as f:
+        f.write(stream.getvalue())
+
+    try:
+        from pyprof2calltree import convert  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        _LOGGER.debug("pyprof2calltree not installed, skipping callgrind output")
+    else:
+        files["callgrind"] = f"{basename}.callgrind.out"
+        convert(stats, files["callgrind"])
+
+    _LOGGER.info("Profile written to %s", files["stats"])
+    return files
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, tzinfo
+from typing import List
+
+from .common import EpochMarketprice, Marketprice
+
+# tolerance for float timestamps when checking if a bucket is complete
+EPSILON = 1e-6
+
+SECONDS_PER_HOUR = 3600
+
+
+def _local_bucket(ts: float, step: int, tz: tzinfo) -> tuple[float, float]:
+    """Start and end of the bucket containing ts in wall clock time of tz.
+
+    The buckets are multiples of step since local midnight, so they are
+    shorter or longer than step on DST changes.
+    """
+    local = datetime.fromtimestamp(ts, tz).replace(tzinfo=None)
+    midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    start = midnight + timedelta(
+        seconds=(local - midnight).total_seconds() // step * step
+    )
+    end = start + timedelta(seconds=step)
+    return start.replace(tzinfo=tz).timestamp(), end.replace(tzinfo=tz).timestamp()
+
+
+def _align(ts: float, step: int, tz: tzinfo | None) -> float:
+    """Start of the bucket containing ts, aligned to midnight in tz (or UTC)."""
+    if tz is None:
+        return ts - ts % step
+    if step > SECONDS_PER_HOUR:
+        return _local_bucket(ts, step, tz)[0]
+    offset = datetime.fromtimestamp(ts, tz).utcoffset().total_seconds()
+    return ts - (ts + offset) % step
+
+
+def _bucket_end(bucket: float, step: int, tz: tzinfo | None) -> float:
+    """End of the bucket, which differs from bucket + step on DST changes."""
+    if tz is None or step <= SECONDS_PER_HOUR:
+        return bucket + step
+    return _local_bucket(bucket, step, tz)[1]
+
+
+def resample(
+    marketdata: List[Marketprice], duration: int, tz: tzinfo | None = None
+) -> List[Marketprice]:
+    """Convert market data to buckets of the given duration in minutes.
+
+    The buckets are aligned to multiples of duration since midnight in tz,
+    or UTC if tz is None. The price of a bucket is the time weighted average
+    of all entries overlapping it, so entries of any, even mixed, length can
+    be converted to a coarser or finer resolution. Local buckets longer
+    than an hour follow the wall clock, so they are shorter or longer on
+    DST changes. Buckets which are not
+    completely covered by market data are dropped instead of averaging only
+    the available part. Runs in O(n + buckets).
+    """
+    if not marketdata:
+        return []
+
+    starts = [e.start_timestamp for e in marketdata]
+    ends = [e.end_timestamp for e in marketdata]
+    prices = [e.market_price_per_kwh for e in marketdata]
+    count = len(prices)
+    step = duration * 60
+
+    result: List[Marketprice] = []
+    i = 0
+    bucket = _align(starts[0], step, tz)
+    while i < count:
+        bucket_end = _bucket_end(bucket, step, tz)
+        length = bucket_end - bucket
+        covered = 0.0
+        weighted = 0.0
+        while i < count and starts[i] < bucket_end:
+            overlap = min(ends[i], bucket_end) - max(starts[i], bucket)
+            if overlap > 0:
+                covered += overlap
+                weighted += prices[i] * overlap
+            if ends[i] > bucket_end:
+                # entry continues in the next bucket
+                break
+            i += 1
+
+        if covered >= length - EPSILON:
+            result.append(
+                EpochMarketprice(bucket, length / 60, round(weighted / length, 6))
+            )
+
+        bucket = bucket_end
+        if i < count and starts[i] > bucket_end:
+            # skip empty buckets of a gap
+            bucket = _align(starts[i], step, tz)
+
+    return result
+
+
+def merge_equal_runs(data: List[Marketprice], duration: int) -> List[Marketprice]:
+    """Merge adjacent entries with equal prices into entries of up to duration.
+
+    The given entries are not modified, merged runs are returned as new
+    entries and all other entries are reused.
+    """
+    entries: List[Marketprice] = []
+    max_length = duration * 60
+    run_start = 0
+    for i in range(1, len(data) + 1):
+        first = data[run_start]
+        if (
+            i < len(data)
+            and data[i].market_price_per_kwh == first.market_price_per_kwh
+            and data[i].start_timestamp == data[i - 1].end_timestamp
+            and data[i].start_timestamp < first.start_timestamp + max_length
+        ):
+            continue
+
+        if i - run_start == 1:
+            entries.append(first)
+        else:
+            entries.append(
+                EpochMarketprice(
+                    first.start_timestamp,
+                    (data[i - 1].end_timestamp - first.start_timestamp) / 60,
+                    first.market_price_per_kwh,
+                    first._unit,
+                )
+            )
+        run_start = i
+    return entries
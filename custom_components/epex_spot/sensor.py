@@ -1,27 +1,45 @@
+from bisect import bisect_left
 import logging
-from statistics import median
+from operator import attrgetter
 
 import homeassistant.util.dt as dt_util
 from homeassistant.components.sensor import (
+    SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
+from homeassistant.const import UnitOfTime
 from homeassistant.helpers.typing import StateType
 
 from .const import (
     ATTR_BUY_VOLUME_MWH,
+    ATTR_COUNT,
     ATTR_DATA,
     ATTR_END_TIME,
+    ATTR_MAXIMUM,
+    ATTR_MEDIAN,
+    ATTR_MINIMUM,
     ATTR_QUANTILE,
     ATTR_RANK,
     ATTR_SELL_VOLUME_MWH,
     ATTR_START_TIME,
+    ATTR_THRESHOLD,
     ATTR_VOLUME_MWH,
     CONF_SOURCE,
+    DATA_FORMAT_COMPACT,
     DOMAIN,
+    ROLLING_WINDOW_HOURS,
 )
 from . import EpexSpotEntity, EpexSpotDataUpdateCoordinator as DataUpdateCoordinator
+from .common import compact_series
+from .price_statistics import (
+    WINDOW_NEXT_24H,
+    WINDOW_OFF_PEAK,
+    WINDOW_PEAK,
+    WINDOW_TODAY,
+    WINDOW_TOMORROW,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,11 +60,55 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         EpexSpotHighestPriceSensorEntity(coordinator),
         EpexSpotAveragePriceSensorEntity(coordinator),
         EpexSpotMedianPriceSensorEntity(coordinator),
+        EpexSpotWindowPriceSensorEntity(
+            coordinator, WINDOW_TOMORROW, "Tomorrow Average Price"
+        ),
+        EpexSpotWindowPriceSensorEntity(
+            coordinator, WINDOW_NEXT_24H, "Next 24h Average Price"
+        ),
+        EpexSpotWindowPriceSensorEntity(coordinator, WINDOW_PEAK, "Peak Average Price"),
+        EpexSpotWindowPriceSensorEntity(
+            coordinator, WINDOW_OFF_PEAK, "Off-Peak Average Price"
+        ),
+        EpexSpotNextCheapStartSensorEntity(coordinator),
+        EpexSpotCheapRunLengthSensorEntity(coordinator),
+        EpexSpotNextExpensiveStartSensorEntity(coordinator),
     ]
+    for hours in ROLLING_WINDOW_HOURS:
+        entities.append(EpexSpotRollingRankSensorEntity(coordinator, hours))
+        entities.append(EpexSpotRollingQuantileSensorEntity(coordinator, hours))
+    for duration in coordinator.source.extra_durations:
+        entities.append(EpexSpotResampledMarketPriceSensorEntity(coordinator, duration))
+        entities.append(EpexSpotResampledTotalPriceSensorEntity(coordinator, duration))
 
     async_add_entities(entities)
 
 
+def _data_signature(source, marketdata):
+    """Signature of an exposed data attribute, which shrinks by eviction."""
+    return len(marketdata) if source.expose_data else None
+
+
+def _data_attribute(source, marketdata, name, value):
+    """Encode the data attribute in the configured format."""
+    if source.data_format == DATA_FORMAT_COMPACT:
+        data = compact_series(
+            sorted(marketdata, key=attrgetter("start_timestamp")), value
+        )
+        if data["start"] is not None:
+            data["start"] = dt_util.as_local(data["start"]).isoformat()
+        return data
+
+    return [
+        {
+            ATTR_START_TIME: dt_util.as_local(e.start_time).isoformat(),
+            ATTR_END_TIME: dt_util.as_local(e.end_time).isoformat(),
+            name: value(e),
+        }
+        for e in marketdata
+    ]
+
+
 class EpexSpotMarketPriceSensorEntity(EpexSpotEntity, SensorEntity):
     """Home Assistant sensor containing all EPEX spot data."""
 
@@ -67,20 +129,24 @@ class EpexSpotMarketPriceSensorEntity(EpexSpotEntity, SensorEntity):
 
     @property
     def extra_state_attributes(self):
-        data = [
-            {
-                ATTR_START_TIME: dt_util.as_local(e.start_time).isoformat(),
-                ATTR_END_TIME: dt_util.as_local(e.end_time).isoformat(),
-                self._localized.attr_name_per_kwh: e.market_price_per_kwh,
-            }
-            for e in self._source.marketdata
-        ]
+        if not self._source.expose_data:
+            return {self._localized.attr_name_per_kwh: self.native_value}
+
+        data = _data_attribute(
+            self._source,
+            self._source.marketdata,
+            self._localized.attr_name_per_kwh,
+            attrgetter("market_price_per_kwh"),
+        )
 
         return {
             ATTR_DATA: data,
             self._localized.attr_name_per_kwh: self.native_value,
         }
 
+    def _signature_extra(self):
+        return _data_signature(self._source, self._source.marketdata)
+
 
 class EpexSpotTotalPriceSensorEntity(EpexSpotEntity, SensorEntity):
     """Home Assistant sensor containing all EPEX spot data."""
@@ -105,19 +171,105 @@ class EpexSpotTotalPriceSensorEntity(EpexSpotEntity, SensorEntity):
 
     @property
     def extra_state_attributes(self):
-        data = [
-            {
-                ATTR_START_TIME: dt_util.as_local(e.start_time).isoformat(),
-                ATTR_END_TIME: dt_util.as_local(e.end_time).isoformat(),
-                self._localized.attr_name_per_kwh: self._source.to_total_price(
-                    e.market_price_per_kwh
-                ),
-            }
-            for e in self._source.marketdata
-        ]
+        if not self._source.expose_data:
+            return None
+
+        data = _data_attribute(
+            self._source,
+            self._source.marketdata,
+            self._localized.attr_name_per_kwh,
+            lambda e: self._source.to_total_price(e.market_price_per_kwh),
+        )
 
         return {ATTR_DATA: data}
 
+    def _signature_extra(self):
+        return _data_signature(self._source, self._source.marketdata)
+
+
+class EpexSpotResampledMarketPriceSensorEntity(EpexSpotEntity, SensorEntity):
+    """Market price resampled to a coarser duration."""
+
+    def __init__(self, coordinator: DataUpdateCoordinator, duration: int):
+        self.entity_description = SensorEntityDescription(
+            key=f"MarketPrice {duration}",
+            name=f"Market Price {duration} min",
+            state_class=SensorStateClass.MEASUREMENT,
+        )
+        super().__init__(coordinator, self.entity_description)
+        self._duration = duration
+        self._attr_icon = self._localized.icon
+        self._attr_native_unit_of_measurement = self._localized.uom_per_kwh
+
+    @property
+    def native_value(self) -> StateType:
+        entry = self._source.marketdata_now_for(self._duration)
+        return None if entry is None else entry.market_price_per_kwh
+
+    @property
+    def extra_state_attributes(self):
+        if not self._source.expose_data:
+            return {self._localized.attr_name_per_kwh: self.native_value}
+
+        data = _data_attribute(
+            self._source,
+            self._source.marketdata_for(self._duration),
+            self._localized.attr_name_per_kwh,
+            attrgetter("market_price_per_kwh"),
+        )
+
+        return {
+            ATTR_DATA: data,
+            self._localized.attr_name_per_kwh: self.native_value,
+        }
+
+    def _signature_extra(self):
+        return _data_signature(
+            self._source, self._source.marketdata_for(self._duration)
+        )
+
+
+class EpexSpotResampledTotalPriceSensorEntity(EpexSpotEntity, SensorEntity):
+    """Total price resampled to a coarser duration."""
+
+    def __init__(self, coordinator: DataUpdateCoordinator, duration: int):
+        self.entity_description = SensorEntityDescription(
+            key=f"Total Price {duration}",
+            name=f"Total Price {duration} min",
+            suggested_display_precision=6,
+            state_class=SensorStateClass.MEASUREMENT,
+        )
+        super().__init__(coordinator, self.entity_description)
+        self._duration = duration
+        self._attr_icon = self._localized.icon
+        self._attr_native_unit_of_measurement = self._localized.uom_per_kwh
+
+    @property
+    def native_value(self) -> StateType:
+        entry = self._source.marketdata_now_for(self._duration)
+        if entry is None:
+            return None
+        return self._source.to_total_price(entry.market_price_per_kwh)
+
+    @property
+    def extra_state_attributes(self):
+        if not self._source.expose_data:
+            return None
+
+        data = _data_attribute(
+            self._source,
+            self._source.marketdata_for(self._duration),
+            self._localized.attr_name_per_kwh,
+            lambda e: self._source.to_total_price(e.market_price_per_kwh),
+        )
+
+        return {ATTR_DATA: data}
+
+    def _signature_extra(self):
+        return _data_signature(
+            self._source, self._source.marketdata_for(self._duration)
+        )
+
 
 class EpexSpotBuyVolumeSensorEntity(EpexSpotEntity, SensorEntity):
     """Home Assistant sensor containing all EPEX spot data."""
@@ -150,6 +302,9 @@ class EpexSpotBuyVolumeSensorEntity(EpexSpotEntity, SensorEntity):
 
         return {ATTR_DATA: data}
 
+    def _signature_extra(self):
+        return len(self._source.marketdata)
+
 
 class EpexSpotSellVolumeSensorEntity(EpexSpotEntity, SensorEntity):
     """Home Assistant sensor containing all EPEX spot data."""
@@ -182,6 +337,9 @@ class EpexSpotSellVolumeSensorEntity(EpexSpotEntity, SensorEntity):
 
         return {ATTR_DATA: data}
 
+    def _signature_extra(self):
+        return len(self._source.marketdata)
+
 
 class EpexSpotVolumeSensorEntity(EpexSpotEntity, SensorEntity):
     """Home Assistant sensor containing all EPEX spot data."""
@@ -214,6 +372,9 @@ class EpexSpotVolumeSensorEntity(EpexSpotEntity, SensorEntity):
 
         return {ATTR_DATA: data}
 
+    def _signature_extra(self):
+        return len(self._source.marketdata)
+
 
 class EpexSpotRankSensorEntity(EpexSpotEntity, SensorEntity):
     """Home Assistant sensor containing all EPEX spot data."""
@@ -231,23 +392,20 @@ class EpexSpotRankSensorEntity(EpexSpotEntity, SensorEntity):
 
     @property
     def native_value(self) -> StateType:
-        return [
-            e.market_price_per_kwh for e in self._source.sorted_marketdata_today
-        ].index(self._source.marketdata_now.market_price_per_kwh)
+        return self._source.rank_now
 
     @property
     def extra_state_attributes(self):
-        sorted_prices = [
-            e.market_price_per_kwh for e in self._source.sorted_marketdata_today
-        ]
-        data = [
-            {
-                ATTR_START_TIME: dt_util.as_local(e.start_time).isoformat(),
-                ATTR_END_TIME: dt_util.as_local(e.end_time).isoformat(),
-                ATTR_RANK: sorted_prices.index(e.market_price_per_kwh),
-            }
-            for e in self._source.sorted_marketdata_today
-        ]
+        if not self._source.expose_data:
+            return None
+
+        sorted_prices = self._source.sorted_prices_today
+        data = _data_attribute(
+            self._source,
+            self._source.sorted_marketdata_today,
+            ATTR_RANK,
+            lambda e: bisect_left(sorted_prices, e.market_price_per_kwh),
+        )
 
         return {ATTR_DATA: data}
 
@@ -268,28 +426,92 @@ class EpexSpotQuantileSensorEntity(EpexSpotEntity, SensorEntity):
 
     @property
     def native_value(self) -> StateType:
-        current_price = self._source.marketdata_now.market_price_per_kwh
-        min_price = self._source.sorted_marketdata_today[0].market_price_per_kwh
-        max_price = self._source.sorted_marketdata_today[-1].market_price_per_kwh
-        return (current_price - min_price) / (max_price - min_price)
+        return self._source.quantile_now
 
     @property
     def extra_state_attributes(self):
+        if not self._source.expose_data:
+            return None
+
         min_price = self._source.sorted_marketdata_today[0].market_price_per_kwh
         max_price = self._source.sorted_marketdata_today[-1].market_price_per_kwh
-        data = [
-            {
-                ATTR_START_TIME: dt_util.as_local(e.start_time).isoformat(),
-                ATTR_END_TIME: dt_util.as_local(e.end_time).isoformat(),
-                ATTR_QUANTILE: (e.market_price_per_kwh - min_price)
-                / (max_price - min_price),
-            }
-            for e in self._source.sorted_marketdata_today
-        ]
+        data = _data_attribute(
+            self._source,
+            self._source.sorted_marketdata_today,
+            ATTR_QUANTILE,
+            lambda e: (e.market_price_per_kwh - min_price) / (max_price - min_price),
+        )
 
         return {ATTR_DATA: data}
 
 
+class EpexSpotRollingRankSensorEntity(EpexSpotEntity, SensorEntity):
+    """Rank of the current price within the next hours."""
+
+    def __init__(self, coordinator: DataUpdateCoordinator, hours: int):
+        self.entity_description = SensorEntityDescription(
+            key=f"Rank {hours}h",
+            name=f"Rank Next {hours}h",
+            native_unit_of_measurement="",
+            suggested_display_precision=0,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_registry_enabled_default=False,
+        )
+        super().__init__(coordinator, self.entity_description)
+        self._hours = hours
+
+    @property
+    def native_value(self) -> StateType:
+        return self._source.rolling_rank_now(self._hours)
+
+    @property
+    def extra_state_attributes(self):
+        stats = self._source.rolling_statistics(self._hours)
+        if stats is None:
+            return None
+        return {ATTR_COUNT: stats.count}
+
+    def _signature_extra(self):
+        # the window moves with the current entry
+        stats = self._source.rolling_statistics(self._hours)
+        return None if stats is None else stats.count
+
+
+class EpexSpotRollingQuantileSensorEntity(EpexSpotEntity, SensorEntity):
+    """Quantile of the current price within the next hours."""
+
+    def __init__(self, coordinator: DataUpdateCoordinator, hours: int):
+        self.entity_description = SensorEntityDescription(
+            key=f"Quantile {hours}h",
+            name=f"Quantile Next {hours}h",
+            native_unit_of_measurement="",
+            suggested_display_precision=2,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_registry_enabled_default=False,
+        )
+        super().__init__(coordinator, self.entity_description)
+        self._hours = hours
+
+    @property
+    def native_value(self) -> StateType:
+        return self._source.rolling_quantile_now(self._hours)
+
+    @property
+    def extra_state_attributes(self):
+        stats = self._source.rolling_statistics(self._hours)
+        if stats is None:
+            return None
+        return {
+            ATTR_MINIMUM: stats.minimum,
+            ATTR_MEDIAN: stats.percentile(0.5),
+            ATTR_MAXIMUM: stats.maximum,
+        }
+
+    def _signature_extra(self):
+        # the window moves with the current entry
+        return self.extra_state_attributes
+
+
 class EpexSpotLowestPriceSensorEntity(EpexSpotEntity, SensorEntity):
     """Home Assistant sensor containing all EPEX spot data."""
 
@@ -367,8 +589,8 @@ class EpexSpotAveragePriceSensorEntity(EpexSpotEntity, SensorEntity):
 
     @property
     def native_value(self) -> StateType:
-        s = sum(e.market_price_per_kwh for e in self._source.sorted_marketdata_today)
-        return s / len(self._source.sorted_marketdata_today)
+        stats = self._source.price_statistics(WINDOW_TODAY)
+        return None if stats is None else stats.mean
 
     @property
     def extra_state_attributes(self):
@@ -394,12 +616,132 @@ class EpexSpotMedianPriceSensorEntity(EpexSpotEntity, SensorEntity):
 
     @property
     def native_value(self) -> StateType:
-        return median(
-            [e.market_price_per_kwh for e in self._source.sorted_marketdata_today]
+        stats = self._source.price_statistics(WINDOW_TODAY)
+        return None if stats is None else stats.median
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            self._localized.attr_name_per_kwh: self.native_value,
+        }
+
+
+class EpexSpotWindowPriceSensorEntity(EpexSpotEntity, SensorEntity):
+    """Average price of a window of the aggregate table."""
+
+    def __init__(self, coordinator: DataUpdateCoordinator, window: str, name: str):
+        self.entity_description = SensorEntityDescription(
+            key=name,
+            name=name,
+            suggested_display_precision=6,
+            state_class=SensorStateClass.MEASUREMENT,
+            entity_registry_enabled_default=False,
         )
+        super().__init__(coordinator, self.entity_description)
+        self._window = window
+        self._attr_icon = self._localized.icon
+        self._attr_native_unit_of_measurement = self._localized.uom_per_kwh
+
+    @property
+    def native_value(self) -> StateType:
+        stats = self._source.price_statistics(self._window)
+        return None if stats is None else stats.mean
 
     @property
     def extra_state_attributes(self):
+        stats = self._source.price_statistics(self._window)
+        if stats is None:
+            return None
         return {
+            **stats.as_dict(),
             self._localized.attr_name_per_kwh: self.native_value,
         }
+
+    def _signature_extra(self):
+        # the next 24h window moves with the current entry
+        return self._source.price_statistics(self._window)
+
+
+class EpexSpotNextCheapStartSensorEntity(EpexSpotEntity, SensorEntity):
+    """Start of the current or next run below today's median price."""
+
+    entity_description = SensorEntityDescription(
+        key="Next Cheap Start",
+        name="Next Cheap Start",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_registry_enabled_default=False,
+    )
+
+    def __init__(self, coordinator: DataUpdateCoordinator):
+        super().__init__(coordinator, self.entity_description)
+
+    @property
+    def native_value(self) -> StateType:
+        run = self._source.cheap_run
+        return None if run is None else run[0]
+
+    @property
+    def extra_state_attributes(self):
+        run = self._source.cheap_run
+        if run is None:
+            return None
+        return {
+            ATTR_END_TIME: dt_util.as_local(run[1]).isoformat(),
+            ATTR_THRESHOLD: self._source.cheap_threshold,
+        }
+
+    def _signature_extra(self):
+        return self._source.cheap_run
+
+
+class EpexSpotCheapRunLengthSensorEntity(EpexSpotEntity, SensorEntity):
+    """Length of the current or next run below today's median price."""
+
+    entity_description = SensorEntityDescription(
+        key="Cheap Run Length",
+        name="Cheap Run Length",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        suggested_display_precision=0,
+        entity_registry_enabled_default=False,
+    )
+
+    def __init__(self, coordinator: DataUpdateCoordinator):
+        super().__init__(coordinator, self.entity_description)
+
+    @property
+    def native_value(self) -> StateType:
+        run = self._source.cheap_run
+        return None if run is None else (run[1] - run[0]).total_seconds() / 60
+
+
+class EpexSpotNextExpensiveStartSensorEntity(EpexSpotEntity, SensorEntity):
+    """Start of the current or next run at or above today's median price."""
+
+    entity_description = SensorEntityDescription(
+        key="Next Expensive Start",
+        name="Next Expensive Start",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_registry_enabled_default=False,
+    )
+
+    def __init__(self, coordinator: DataUpdateCoordinator):
+        super().__init__(coordinator, self.entity_description)
+
+    @property
+    def native_value(self) -> StateType:
+        run = self._source.expensive_run
+        return None if run is None else run[0]
+
+    @property
+    def extra_state_attributes(self):
+        run = self._source.expensive_run
+        if run is None:
+            return None
+        return {
+            ATTR_END_TIME: dt_util.as_local(run[1]).isoformat(),
+            ATTR_THRESHOLD: self._source.cheap_threshold,
+        }
+
+    def _signature_extra(self):
+        return self._source.expensive_run
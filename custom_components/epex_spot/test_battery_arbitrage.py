@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+from datetime import datetime, timedelta, timezone
+
+from .battery_arbitrage import optimize_battery
+
+
+def main():
+    # cheap at night and around noon, expensive in the morning and evening
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    duration = timedelta(minutes=15)
+    slots = []
+    for i in range(96):
+        hour = i // 4
+        price = 0.35 if 6 <= hour < 9 or 17 <= hour < 21 else 0.15
+        slots.append((start + i * duration, start + (i + 1) * duration, price))
+
+    # home batteries with (capacity kWh, power kW)
+    for capacity, power in ((20, 1.5), (13.5, 1.2), (10, 0.9), (100, 1)):
+        stored, savings = optimize_battery(
+            slots,
+            capacity=capacity,
+            state_of_charge=0,
+            max_charge_power=power,
+            max_discharge_power=power,
+            efficiency=0.9,
+        )
+        print(f"{capacity} kWh / {power} kW: savings = {savings:.3f}")
+        print(" ".join(f"{energy:.1f}" for energy in stored))
+
+        assert savings > 0
+        assert max(stored) > min(stored)
+        for previous, energy in zip(stored, stored[1:]):
+            assert abs(energy - previous) <= power * 0.25 * 0.9**-0.5 + 1e-9
+
+
+main()
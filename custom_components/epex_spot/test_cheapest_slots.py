@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+from datetime import datetime, timedelta, timezone
+
+from .cheapest_slots import find_cheapest_slots
+from .common import Marketprice
+from .extreme_price_interval import PriceIndex
+
+
+def main():
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    marketdata = [
+        Marketprice(start + i * timedelta(minutes=15), 15, price)
+        for i, price in enumerate([5, 5, 1, 1, 1, 1, 5, 5])
+    ]
+    index = PriceIndex.from_marketdata(marketdata)
+    end = start + timedelta(hours=2)
+
+    # the cheapest block 00:30-01:30 must not prevent a selection
+    selected = find_cheapest_slots(
+        marketdata,
+        index,
+        start,
+        end,
+        duration=timedelta(hours=2),
+        min_block=timedelta(hours=1),
+    )
+    print(selected)
+    assert [(s - start, e - start) for s, e, _ in selected] == [
+        (timedelta(0), timedelta(hours=1)),
+        (timedelta(hours=1), timedelta(hours=2)),
+    ]
+
+    # two cheapest blocks of 30 minutes
+    selected = find_cheapest_slots(
+        marketdata,
+        index,
+        start,
+        end,
+        duration=timedelta(hours=1),
+        min_block=timedelta(minutes=30),
+    )
+    print(selected)
+    assert [price for _, _, price in selected] == [1, 1]
+
+    # not enough room for the blocks
+    assert not find_cheapest_slots(
+        marketdata,
+        index,
+        start,
+        end,
+        duration=timedelta(hours=3),
+        min_block=timedelta(hours=1),
+    )
+
+    # by count and by duration
+    selected = find_cheapest_slots(marketdata, index, start, end, count=3)
+    assert [price for _, _, price in selected] == [1, 1, 1]
+    selected = find_cheapest_slots(
+        marketdata, index, start, end, duration=timedelta(minutes=70)
+    )
+    assert sum((e - s for s, e, _ in selected), timedelta(0)) == timedelta(minutes=70)
+    assert sorted(price for _, _, price in selected) == [1, 1, 1, 1, 5]
+
+
+main()
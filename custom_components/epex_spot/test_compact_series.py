@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+from datetime import datetime, timezone
+
+from .common import EpochMarketprice, compact_series
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def entry(start_minute, duration, price):
+    return EpochMarketprice(START.timestamp() + start_minute * 60, duration, price)
+
+
+def price(e):
+    return e.market_price_per_kwh
+
+
+def main():
+    assert compact_series([], price) == {"start": None, "step": None, "values": []}
+
+    # one value per step, counts are omitted
+    data = [entry(i * 60, 60, p) for i, p in enumerate([1, 2, 3])]
+    assert compact_series(data, price) == {
+        "start": START,
+        "step": 60,
+        "values": [1, 2, 3],
+    }
+
+    # adjacent equal values are merged
+    data = [entry(i * 15, 15, p) for i, p in enumerate([1, 1, 1, 2])]
+    assert compact_series(data, price) == {
+        "start": START,
+        "step": 15,
+        "values": [1, 2],
+        "counts": [3, 1],
+    }
+
+    # mixed durations use the greatest common divisor as step
+    data = [entry(0, 60, 1), entry(60, 15, 2), entry(75, 15, 3)]
+    assert compact_series(data, price) == {
+        "start": START,
+        "step": 15,
+        "values": [1, 2, 3],
+        "counts": [4, 1, 1],
+    }
+
+    # gaps are encoded as None and break runs of equal values
+    data = [entry(0, 60, 1), entry(120, 60, 1), entry(180, 60, 2)]
+    assert compact_series(data, price) == {
+        "start": START,
+        "step": 60,
+        "values": [1, None, 1, 2],
+    }
+
+
+main()
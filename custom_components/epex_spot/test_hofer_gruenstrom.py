@@ -9,7 +9,8 @@ from .EPEXSpot import HoferGruenstrom
 
 
 async def main():
-    async with aiohttp.ClientSession() as session:
+    connector = aiohttp.TCPConnector(ssl=False)
+    async with aiohttp.ClientSession(connector=connector) as session:
         service = HoferGruenstrom.HoferGruenstrom(market_area="at", session=session, duration=15)
 
         await service.fetch()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+from datetime import datetime, timedelta, timezone
+
+from .common import EpochMarketprice, merge_marketdata, trim_marketdata
+
+
+def series(start_hour, prices, duration=60):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+    return [
+        EpochMarketprice(start + start_hour * 3600 + i * duration * 60, duration, p)
+        for i, p in enumerate(prices)
+    ]
+
+
+def spans(data):
+    return [(e.start_timestamp, e.end_timestamp) for e in data]
+
+
+def main():
+    current = series(0, [1, 2, 3, 4, 5, 6])
+
+    # fetching from now keeps the entries before the new list
+    merged, changed = merge_marketdata(current, series(3, [4, 5, 6]))
+    assert not changed and merged is current
+
+    # new and changed prices
+    merged, changed = merge_marketdata(current, series(3, [4, 9, 6, 7]))
+    assert changed
+    assert [e.market_price_per_kwh for e in merged] == [1, 2, 3, 4, 9, 6, 7]
+    assert merged[3] is current[3]
+
+    # a removed entry is a change
+    new = series(3, [4, 5, 6])
+    merged, changed = merge_marketdata(current, [new[0], new[2]])
+    assert changed and len(merged) == 5
+
+    # an entry overlapping the start of the new list is replaced
+    current = series(0, [1, 2, 3])
+    new = series(1.75, [7], duration=15)
+    merged, changed = merge_marketdata(current, new)
+    assert changed
+    assert spans(merged) == spans(current[:1] + new + current[2:])
+    assert all(a.end_timestamp <= b.start_timestamp for a, b in zip(merged, merged[1:]))
+
+    # trimming drops entries ending before earliest or starting at latest
+    current = series(0, [1, 2, 3, 4])
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert trim_marketdata(current, start, start + timedelta(hours=4)) is current
+    trimmed = trim_marketdata(
+        current, start + timedelta(minutes=90), start + timedelta(hours=3)
+    )
+    assert [e.market_price_per_kwh for e in trimmed] == [2, 3]
+
+
+main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import random
+
+from .common import EpochMarketprice
+from .order_statistics import FenwickTree, RollingOrderStatistics
+
+HOUR = 3600
+
+
+def series(prices):
+    return [EpochMarketprice(i * HOUR, 60, p) for i, p in enumerate(prices)]
+
+
+def percentile(prices, q):
+    prices = sorted(prices)
+    pos = q * (len(prices) - 1)
+    lower = int(pos)
+    if lower == pos:
+        return prices[lower]
+    return prices[lower] * (lower + 1 - pos) + prices[lower + 1] * (pos - lower)
+
+
+def main():
+    tree = FenwickTree(5)
+    for index in [0, 2, 2, 4]:
+        tree.add(index, 1)
+    assert [tree.prefix_sum(i) for i in range(6)] == [0, 1, 1, 3, 3, 4]
+    assert [tree.find(k) for k in range(4)] == [0, 2, 2, 4]
+
+    stats = RollingOrderStatistics(series([3, 1, 4, 1, 5, 9, 2, 6]), hours=4)
+    assert stats.count == 0 and stats.minimum is None
+    assert stats.percentile(0.5) is None
+
+    stats.advance(0)
+    assert stats.count == 4
+    assert (stats.minimum, stats.maximum) == (1, 4)
+    assert stats.rank(3) == 2 and stats.rank(1) == 0 and stats.rank(10) == 4
+    assert stats.percentile(0.5) == 2
+
+    # the window contains the entries starting within it
+    stats.advance(2.5 * HOUR)
+    assert stats.count == 4 and (stats.minimum, stats.maximum) == (1, 9)
+
+    # the window is shorter at the end of the market data
+    stats.advance(6 * HOUR)
+    assert stats.count == 2 and stats.percentile(0.25) == 3
+
+    # moving backwards starts over
+    stats.advance(0)
+    assert stats.count == 4 and stats.maximum == 4
+
+    # compare with sorting the window
+    rng = random.Random(42)
+    prices = [rng.choice(range(-5, 20)) / 100 for _ in range(96)]
+    stats = RollingOrderStatistics(series(prices), hours=12)
+    for start in range(0, 96, 5):
+        stats.advance(start * HOUR)
+        window = prices[start : start + 12]
+        assert stats.count == len(window)
+        assert stats.minimum == min(window) and stats.maximum == max(window)
+        assert stats.rank(prices[start]) == sum(p < prices[start] for p in window)
+        for q in (0, 0.1, 0.5, 0.9, 1):
+            assert abs(stats.percentile(q) - percentile(window, q)) < 1e-9
+
+
+main()
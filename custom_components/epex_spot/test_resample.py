@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from .common import EpochMarketprice
+from .resample import merge_equal_runs, resample
+
+BERLIN = ZoneInfo("Europe/Berlin")
+
+
+def series(start, prices, duration=60):
+    return [
+        EpochMarketprice(start.timestamp() + i * duration * 60, duration, p)
+        for i, p in enumerate(prices)
+    ]
+
+
+def prices(data):
+    return [e.market_price_per_kwh for e in data]
+
+
+def hours(data):
+    return [(e.end_timestamp - e.start_timestamp) / 3600 for e in data]
+
+
+def local_day(year, month, day):
+    """Quarter hours of a whole local day in Berlin, priced by their index."""
+    start = datetime(year, month, day, tzinfo=BERLIN)
+    # adding a day to an aware datetime keeps the wall clock time
+    end = start + timedelta(days=1)
+    count = int(end.timestamp() - start.timestamp()) // 900
+    return series(start, range(count), duration=15)
+
+
+def main():
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    # quarter hours are averaged to hours
+    data = series(start, [1, 2, 3, 4, 5, 5, 5, 5], duration=15)
+    assert prices(resample(data, 60)) == [2.5, 5]
+
+    # hours are split into quarter hours
+    data = series(start, [1, 2])
+    assert prices(resample(data, 15)) == [1, 1, 1, 1, 2, 2, 2, 2]
+
+    # mixed durations are weighted by time
+    data = series(start, [4]) + series(start + timedelta(hours=1), [0, 4], 30)
+    assert prices(resample(data, 120)) == [3]
+
+    # incomplete buckets are dropped, also around gaps
+    data = series(start + timedelta(minutes=15), [1, 1, 1, 2, 2, 2, 2], 15)
+    data += series(start + timedelta(hours=3), [3, 3, 3, 3], 15)
+    result = resample(data, 60)
+    assert prices(result) == [2, 3]
+    assert result[1].start_time == start + timedelta(hours=3)
+
+    # buckets are aligned to local midnight
+    data = series(datetime(2025, 1, 1, tzinfo=BERLIN), range(24))
+    result = resample(data, 240, BERLIN)
+    assert len(result) == 6 and result[0].start_time == data[0].start_time
+
+    # the local day has 23 hours when DST starts
+    data = local_day(2025, 3, 30)
+    assert hours(resample(data, 60, BERLIN)) == [1] * 23
+    assert hours(resample(data, 240, BERLIN)) == [3, 4, 4, 4, 4, 4]
+    (day,) = resample(data, 1440, BERLIN)
+    assert day.start_time == data[0].start_time and hours([day]) == [23]
+    assert day.market_price_per_kwh == (len(data) - 1) / 2
+
+    # and 25 hours when DST ends
+    data = local_day(2025, 10, 26)
+    assert hours(resample(data, 60, BERLIN)) == [1] * 25
+    assert hours(resample(data, 240, BERLIN)) == [5, 4, 4, 4, 4, 4]
+    (day,) = resample(data, 1440, BERLIN)
+    assert day.start_time == data[0].start_time and hours([day]) == [25]
+
+    # equal adjacent prices are merged up to the duration
+    data = series(start, [1, 1, 1, 1, 1, 2], duration=15)
+    merged = merge_equal_runs(data, 60)
+    assert prices(merged) == [1, 1, 2] and hours(merged) == [1, 0.25, 0.25]
+    assert merged[2] is data[5]
+
+
+main()
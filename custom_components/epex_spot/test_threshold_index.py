@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+from .common import EpochMarketprice
+from .threshold_index import ThresholdIndex
+
+HOUR = 3600
+
+
+def series(prices, start_hour=0):
+    return [
+        EpochMarketprice((start_hour + i) * HOUR, 60, p) for i, p in enumerate(prices)
+    ]
+
+
+def hours(run):
+    return None if run is None else (run[0] / HOUR, run[1] / HOUR)
+
+
+def main():
+    index = ThresholdIndex(series([5, 1, 2, 5, 5, 1, 5]), threshold=3)
+
+    # the run containing ts starts before it
+    assert hours(index.next_run(0)) == (1, 3)
+    assert hours(index.next_run(1.5 * HOUR)) == (1, 3)
+    assert hours(index.next_run(3 * HOUR)) == (5, 6)
+    assert index.next_run(6 * HOUR) is None
+
+    # the threshold itself is expensive
+    assert hours(index.next_run(0, below=False)) == (0, 1)
+    assert hours(index.next_run(1 * HOUR, below=False)) == (3, 5)
+
+    # only the part of a run after ts counts for min_duration
+    assert hours(index.next_run(0, min_duration=2 * HOUR)) == (1, 3)
+    assert index.next_run(2 * HOUR, min_duration=2 * HOUR) is None
+    assert hours(index.next_run(4.5 * HOUR, below=False, min_duration=HOUR)) == (6, 7)
+
+    # a gap ends a run
+    index = ThresholdIndex(series([1, 1]) + series([1], start_hour=3), threshold=3)
+    assert index.next_run(0, min_duration=3 * HOUR) is None
+    assert hours(index.next_run(2 * HOUR)) == (3, 4)
+
+    # trimming drops runs before ts and shortens the one containing it
+    index = ThresholdIndex(series([1, 1, 1, 5, 1]), threshold=3).trimmed(2 * HOUR)
+    assert hours(index.next_run(0)) == (2, 3)
+    assert hours(index.next_run(0, below=False)) == (3, 4)
+    assert hours(index.next_run(0, min_duration=2 * HOUR)) is None
+
+
+main()
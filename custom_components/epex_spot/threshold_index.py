@@ -0,0 +1,62 @@
+from bisect import bisect_right
+
+
+class ThresholdIndex:
+    """Runs of adjacent entries below or above a price threshold.
+
+    The market data is split once into maximal runs of adjacent entries
+    which are all below (cheap) or all at or above (expensive) the
+    threshold. A gap in the market data ends a run. Finding the next run
+    bisects the run ends instead of scanning the entries.
+    """
+
+    def __init__(self, marketdata, threshold: float):
+        self.threshold = threshold
+        # (starts, ends) of the cheap (True) and expensive (False) runs
+        self._runs: dict[bool, tuple[list[float], list[float]]] = {
+            True: ([], []),
+            False: ([], []),
+        }
+        prev_below = None
+        prev_end = None
+        for e in marketdata:
+            below = e.market_price_per_kwh < threshold
+            starts, ends = self._runs[below]
+            if below == prev_below and e.start_timestamp == prev_end:
+                ends[-1] = e.end_timestamp
+            else:
+                starts.append(e.start_timestamp)
+                ends.append(e.end_timestamp)
+            prev_below = below
+            prev_end = e.end_timestamp
+
+    def trimmed(self, ts: float) -> "ThresholdIndex":
+        """Index without the entries which end at or before ts.
+
+        ts must be the start of the first remaining entry, a run containing
+        it is shortened to start at ts.
+        """
+        index = self.__class__.__new__(self.__class__)
+        index.threshold = self.threshold
+        index._runs = {}
+        for below, (starts, ends) in self._runs.items():
+            first = bisect_right(ends, ts)
+            starts = starts[first:]
+            if starts and starts[0] < ts:
+                starts[0] = ts
+            index._runs[below] = (starts, ends[first:])
+        return index
+
+    def next_run(
+        self, ts: float, below: bool = True, min_duration: float = 0
+    ) -> tuple[float, float] | None:
+        """Start and end of the run containing ts or the next one after it.
+
+        Only runs with at least min_duration seconds left after ts are
+        considered. The start of a run containing ts is before ts.
+        """
+        starts, ends = self._runs[below]
+        for i in range(bisect_right(ends, ts), len(ends)):
+            if ends[i] - max(starts[i], ts) >= min_duration:
+                return starts[i], ends[i]
+        return None
@@ -0,0 +1,105 @@
+"""Domain wide scheduler for time based refreshes of all config entries."""
+
+import asyncio
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_point_in_utc_time,
+    async_track_time_change,
+)
+from homeassistant.util import dt
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# not stored in hass.data[DOMAIN], which maps entry ids to coordinators
+DATA_TICK_SCHEDULER = f"{DOMAIN}_tick_scheduler"
+
+FETCH_MINUTE = 50
+
+
+class TickScheduler:
+    """Run one set of time listeners for all coordinators.
+
+    A single timer fires at the earliest end of the current entry (or start
+    of the next day) of all coordinators, so there is exactly one wakeup per
+    actual price change, independent of the duration of the entries. Only
+    the coordinators whose current entry, day or market data changed are
+    refreshed. The fetch at minute 50 is started for all coordinators.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._coordinators = []
+        self._unsub_fetch: CALLBACK_TYPE | None = None
+        self._unsub_tick: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add(self, coordinator) -> CALLBACK_TYPE:
+        """Add a coordinator, returns a callback to remove it again."""
+        if not self._coordinators:
+            self._unsub_fetch = async_track_time_change(
+                self._hass, self._on_fetch, hour=None, minute=FETCH_MINUTE, second=0
+            )
+        self._coordinators.append(coordinator)
+        self.async_reschedule()
+
+        @callback
+        def remove():
+            self._coordinators.remove(coordinator)
+            if not self._coordinators:
+                self._unsub_fetch()
+                self._unsub_fetch = None
+            self.async_reschedule()
+
+        return remove
+
+    @callback
+    def async_reschedule(self):
+        """Schedule the timer for the next boundary of all coordinators."""
+        if self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+        if not self._coordinators:
+            return
+
+        now = dt.now()
+        point_in_time = min(c.source.next_update(now) for c in self._coordinators)
+        _LOGGER.debug("next refresh at %s", point_in_time)
+        self._unsub_tick = async_track_point_in_utc_time(
+            self._hass, self._on_tick, dt.as_utc(point_in_time)
+        )
+
+    async def _on_tick(self, _: datetime):
+        self._unsub_tick = None
+        now = dt.now()
+        due = [c for c in self._coordinators if c.source.needs_update(now)]
+        _LOGGER.debug("refreshing %d of %d entries", len(due), len(self._coordinators))
+        try:
+            if due:
+                await asyncio.gather(*(c.on_refresh() for c in due))
+        finally:
+            self.async_reschedule()
+
+    @callback
+    def _on_fetch(self, *args: Any):
+        for coordinator in self._coordinators:
+            self._hass.async_create_task(self._fetch(coordinator))
+
+    async def _fetch(self, coordinator):
+        try:
+            await coordinator.fetch_source()
+        finally:
+            # new data may fill a gap or change the length of the entries
+            self.async_reschedule()
+
+
+@callback
+def async_get_tick_scheduler(hass: HomeAssistant) -> TickScheduler:
+    if (scheduler := hass.data.get(DATA_TICK_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_TICK_SCHEDULER] = TickScheduler(hass)
+    return scheduler